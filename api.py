@@ -0,0 +1,347 @@
+"""Headless HTTP API for resume generation, served by any ASGI server.
+
+Usage:
+    uvicorn api:app --port 8000
+    LLM_BACKEND=fake python api.py --port 8000
+
+Endpoints:
+    GET  /healthz              liveness check
+    GET  /metrics              Prometheus metrics
+    POST /v1/resume/content    user_info JSON -> resume_content JSON
+    POST /v1/resume/pdf        user_info JSON -> application/pdf
+    POST /v1/render            resume_content JSON -> application/pdf
+
+user_info has the shape ResumeForm.get_form_data() produces. The PDF
+endpoints accept ?template=<name>&theme=<name>.
+
+Model calls, template loading and PDF cache lookups run on a thread pool and
+PDFs render on a process pool, so the event loop only parses requests and
+waits. A render pool whose worker died is replaced and the render retried
+once. At most API_MAX_CONCURRENCY generation or render requests are in
+flight; others wait up to API_QUEUE_TIMEOUT seconds for a slot and then get
+a 503 with Retry-After.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs
+
+from config.settings import (
+    API_MAX_CONCURRENCY, API_QUEUE_TIMEOUT, API_RENDER_WORKERS, API_MAX_BODY_BYTES, PDF_TEMPLATE
+)
+from utils import metrics
+from utils.ai_generator import get_ai_generator
+from utils.pdf_generator import PDFGenerator
+from utils.rate_limiter import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+EXPERIENCE_FIELDS = ('company', 'position', 'duration', 'responsibilities')
+EDUCATION_FIELDS = ('institution', 'degree', 'year', 'grade', 'field_of_study', 'achievements', 'location')
+CONTACT_FIELDS = ('name', 'email', 'phone', 'location', 'linkedin', 'github', 'website')
+
+
+class HTTPError(Exception):
+    """An error answered with the given status and a JSON {'error': message} body"""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+def _init_render_worker():
+    """Leave Ctrl+C to the server, which shuts the pool down in order"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def render_pdf(resume_content, template, theme):
+    """Render in a worker process and return (pdf_bytes, page_count)"""
+    generator = PDFGenerator(template=template, theme=theme, use_cache=False)
+    return generator.generate_pdf(resume_content), generator.page_count
+
+
+def _check_strings(values, fields, where):
+    """Raise a 422 unless each of fields present in values is a string"""
+    invalid = [field for field in fields if not isinstance(values.get(field, ''), str)]
+    if invalid:
+        raise HTTPError(422, f"{where}: expected strings for {', '.join(invalid)}")
+
+
+def _check_entries(values, name, fields):
+    """Raise a 422 unless values[name] is a list of objects with optional string fields"""
+    entries = values.get(name, [])
+    if not isinstance(entries, list):
+        raise HTTPError(422, f"'{name}' must be a list")
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise HTTPError(422, f"{name}[{i}] must be an object")
+        _check_strings(entry, fields, f"{name}[{i}]")
+
+
+def cached_pdf(resume_content, template, theme):
+    """Return (generator, cache key, cached (pdf_bytes, page_count) or None); blocking"""
+    generator = PDFGenerator(template=template, theme=theme)
+    key = generator.cache_key(resume_content)
+    return generator, key, generator.cache.get(key)
+
+
+def validate_user_info(user_info):
+    """Check a user_info payload has what AIGenerator needs, raising a 422 otherwise"""
+    if not isinstance(user_info, dict):
+        raise HTTPError(422, "Expected a JSON object")
+    if not isinstance(user_info.get('summary'), str):
+        raise HTTPError(422, "'summary' must be a string")
+    skills = user_info.get('skills')
+    if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+        raise HTTPError(422, "'skills' must be a list of strings")
+    experiences = user_info.get('experience')
+    if not isinstance(experiences, list):
+        raise HTTPError(422, "'experience' must be a list")
+    for i, experience in enumerate(experiences):
+        if not isinstance(experience, dict):
+            raise HTTPError(422, f"experience[{i}] must be an object")
+        missing = [field for field in EXPERIENCE_FIELDS if not isinstance(experience.get(field), str)]
+        if missing:
+            raise HTTPError(422, f"experience[{i}] is missing {', '.join(missing)}")
+    _check_entries(user_info, 'education', EDUCATION_FIELDS)
+    personal_info = user_info.get('personal_info', {})
+    if not isinstance(personal_info, dict):
+        raise HTTPError(422, "'personal_info' must be an object")
+    _check_strings(personal_info, CONTACT_FIELDS, 'personal_info')
+    return user_info
+
+
+def validate_resume_content(resume_content):
+    """Check a resume_content payload has the field types PDFGenerator expects, raising a 422 otherwise"""
+    if not isinstance(resume_content, dict):
+        raise HTTPError(422, "Expected a resume_content JSON object")
+    _check_strings(resume_content, CONTACT_FIELDS + ('professional_summary', 'skills'), 'resume_content')
+    _check_entries(resume_content, 'experience', ('company', 'position', 'duration', 'achievements'))
+    _check_entries(resume_content, 'education', EDUCATION_FIELDS)
+    return resume_content
+
+
+class ResumeAPI:
+    """ASGI application exposing the generation and rendering pipeline"""
+
+    def __init__(self, max_concurrency=API_MAX_CONCURRENCY, queue_timeout=API_QUEUE_TIMEOUT,
+                 render_workers=API_RENDER_WORKERS, max_body_bytes=API_MAX_BODY_BYTES, ai_generator=None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.render_workers = render_workers
+        self.max_body_bytes = max_body_bytes
+        self._ai_generator = ai_generator
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._model_executor = None
+        self._render_executor = None
+        self.routes = {
+            ('GET', '/healthz'): self.healthz,
+            ('GET', '/metrics'): self.prometheus,
+            ('POST', '/v1/resume/content'): self.resume_content,
+            ('POST', '/v1/resume/pdf'): self.resume_pdf,
+            ('POST', '/v1/render'): self.render
+        }
+
+    @property
+    def ai_generator(self):
+        if self._ai_generator is None:
+            self._ai_generator = get_ai_generator()
+        return self._ai_generator
+
+    def start(self):
+        """Create the worker pools (also done lazily on the first request)"""
+        if self._model_executor is None:
+            self._model_executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                      thread_name_prefix='api-model')
+        if self._render_executor is None:
+            # Spawned rather than forked: the server process already runs threads
+            self._render_executor = ProcessPoolExecutor(max_workers=self.render_workers,
+                                                        mp_context=multiprocessing.get_context('spawn'),
+                                                        initializer=_init_render_worker)
+
+    def _replace_render_executor(self, broken):
+        """Swap a broken render pool for a new one, unless another request already did"""
+        if self._render_executor is broken:
+            self._render_executor = None
+            broken.shutdown(wait=False, cancel_futures=True)
+            metrics.inc('api_render_pool_restarts_total')
+            self.start()
+
+    def shutdown(self):
+        for executor in (self._model_executor, self._render_executor):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self._model_executor = self._render_executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle(self, scope, receive, send):
+        start = time.perf_counter()
+        route = (scope['method'], scope['path'].rstrip('/') or '/')
+        handler = self.routes.get(route)
+        try:
+            if handler is None:
+                allowed = [method for method, path in self.routes if path == route[1]]
+                if allowed:
+                    raise HTTPError(405, "Method not allowed", [('allow', ', '.join(allowed))])
+                raise HTTPError(404, "Not found")
+            query = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode()).items()}
+            status, headers, body = await handler(receive, query)
+        except HTTPError as e:
+            status, headers, body = e.status, e.headers, {'error': e.message}
+        except RateLimitError as e:
+            status, headers, body = 503, [('retry-after', '5')], {'error': str(e)}
+        except Exception:
+            logger.exception("Error handling %s %s", *route)
+            status, headers, body = 500, [], {'error': "Internal server error"}
+
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+            headers = headers + [('content-type', 'application/json')]
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.encode(), value.encode()) for name, value in headers]
+                       + [(b'content-length', str(len(body)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+        path = route[1] if handler is not None else 'unmatched'
+        metrics.observe('api_request_seconds', time.perf_counter() - start, path=path, status=status)
+
+    async def _read_json(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise HTTPError(413, f"Request body exceeds {self.max_body_bytes} bytes")
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        try:
+            return json.loads(b''.join(chunks))
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+
+    async def _acquire_slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.inc('api_rejected_total')
+            raise HTTPError(503, "Server busy, please retry", [('retry-after', '1')])
+
+    async def _generate(self, user_info):
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._model_executor, self.ai_generator.generate_content, user_info)
+
+    async def _render(self, resume_content, query):
+        """Return (pdf_bytes, page_count, cache_status), rendering on the process pool on a cache miss"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            generator, key, cached = await loop.run_in_executor(
+                self._model_executor, cached_pdf, resume_content,
+                query.get('template', PDF_TEMPLATE), query.get('theme', 'default')
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if cached is not None:
+            return cached + ('hit',)
+
+        for attempt in range(2):
+            executor = self._render_executor
+            try:
+                pdf_bytes, pages = await loop.run_in_executor(
+                    executor, render_pdf, resume_content, generator.template, generator.theme
+                )
+                break
+            except BrokenProcessPool:
+                logger.warning("Render worker died, replacing the render pool")
+                self._replace_render_executor(executor)
+        else:
+            raise HTTPError(503, "Renderer unavailable, please retry", [('retry-after', '1')])
+
+        await loop.run_in_executor(self._model_executor, generator.cache.set, key, pdf_bytes, pages)
+        return pdf_bytes, pages, 'miss'
+
+    def _pdf_response(self, pdf_bytes, pages, cache_status):
+        headers = [
+            ('content-type', 'application/pdf'),
+            ('content-disposition', 'attachment; filename="resume.pdf"'),
+            ('x-page-count', str(pages)),
+            ('x-cache', cache_status)
+        ]
+        return 200, headers, pdf_bytes
+
+    async def healthz(self, receive, query):
+        return 200, [], {'status': 'ok'}
+
+    async def prometheus(self, receive, query):
+        body = metrics.REGISTRY.render_prometheus().encode('utf-8')
+        return 200, [('content-type', 'text/plain; version=0.0.4; charset=utf-8')], body
+
+    async def resume_content(self, receive, query):
+        user_info = validate_user_info(await self._read_json(receive))
+        await self._acquire_slot()
+        try:
+            return 200, [], await self._generate(user_info)
+        finally:
+            self._slots.release()
+
+    async def resume_pdf(self, receive, query):
+        user_info = validate_user_info(await self._read_json(receive))
+        await self._acquire_slot()
+        try:
+            resume_content = await self._generate(user_info)
+            return self._pdf_response(*await self._render(resume_content, query))
+        finally:
+            self._slots.release()
+
+    async def render(self, receive, query):
+        resume_content = validate_resume_content(await self._read_json(receive))
+        await self._acquire_slot()
+        try:
+            return self._pdf_response(*await self._render(resume_content, query))
+        finally:
+            self._slots.release()
+
+
+app = ResumeAPI()
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the resume generation HTTP API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run('api:app', host=args.host, port=args.port)
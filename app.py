@@ -1,6 +1,10 @@
+import logging
 import streamlit as st
+from config.settings import LOG_LEVEL, METRICS_PORT, WARMUP_ON_START
+from src.admin_ui import AdminUI
 from src.auth_ui import AuthUI
-from src.resume_builder_ui import ResumeBuilderUI
+from utils.metrics import start_metrics_server
+from utils.warmup import start_warmup
 
 def set_page_config():
     st.set_page_config(
@@ -14,9 +18,21 @@ def initialize_navigation():
     if 'current_tab' not in st.session_state:
         st.session_state.current_tab = 0
 
+def initialize_monitoring():
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+def initialize_warmup():
+    # Load the AI and PDF dependencies in the background while users log in
+    if WARMUP_ON_START:
+        start_warmup()
+
 def main():
     set_page_config()
     initialize_navigation()
+    initialize_monitoring()
+    initialize_warmup()
     
     # Initialize authentication
     auth = AuthUI()
@@ -28,6 +44,9 @@ def main():
             st.write(f"👤 Welcome, {st.session_state.username}!")
             if auth.show_logout_button():
                 st.rerun()
+            admin = AdminUI()
+            if admin.is_admin(st.session_state.username):
+                admin.render_metrics_panel()
     
     # Show login page if not logged in
     if not st.session_state.logged_in:
@@ -35,7 +54,9 @@ def main():
         st.write("Please login or register to create your professional resume")
         auth.login_page()
     else:
-        # Initialize and render the resume builder UI
+        # Initialize and render the resume builder UI; imported here so the
+        # login page doesn't pay for the builder's dependencies
+        from src.resume_builder_ui import ResumeBuilderUI
         resume_builder = ResumeBuilderUI()
         resume_builder.render()
 
@@ -0,0 +1,130 @@
+"""Synthetic resume inputs of varying size for the benchmarks.
+
+make_user_info() builds the dict produced by ResumeForm.get_form_data(),
+make_draft() the widget state ResumeForm.get_draft() saves, and
+make_resume_content() the dict PDFGenerator.generate_pdf() renders. All are
+deterministic for a given seed so runs are comparable.
+"""
+import random
+
+# name: (experiences, education entries, bullets per entry)
+SIZES = {
+    'empty': (0, 0, 0),
+    'small': (1, 1, 3),
+    'medium': (4, 2, 6),
+    'large': (10, 5, 20)
+}
+
+WORDS = (
+    'designed built migrated scaled reduced improved automated led shipped owned '
+    'platform pipeline service latency throughput cost reliability customers team '
+    'api database cache queue dashboard release tests monitoring infrastructure'
+).split()
+
+SKILLS = [
+    'Python', 'SQL', 'Docker', 'Kubernetes', 'AWS', 'React', 'Go', 'PostgreSQL',
+    'Redis', 'Terraform', 'Leadership', 'Communication', 'Mentoring', 'Agile'
+]
+
+
+def _sentence(rng, words=14):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _bullets(rng, count):
+    return '\n'.join(f"* {_sentence(rng, rng.randint(10, 24))}" for _ in range(count))
+
+
+def _education(rng, index, bullets):
+    return {
+        'institution': f"University {index + 1}",
+        'degree': rng.choice(['BTech', 'MTech', 'BSc', 'MSc', 'PhD']),
+        'year': str(2010 + index),
+        'grade': f"{rng.uniform(6, 10):.1f}",
+        'field_of_study': 'Computer Science',
+        'achievements': '\n'.join(_sentence(rng) for _ in range(min(bullets, 3))),
+        'location': 'Pune'
+    }
+
+
+def make_user_info(size='medium', seed=0):
+    """Return form data with the experience/education counts of SIZES[size]"""
+    experiences, education, bullets = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+    return {
+        'personal_info': {
+            'name': 'Jane Doe',
+            'email': 'jane@example.com',
+            'phone': '9876543210',
+            'location': 'Pune'
+        },
+        'summary': ' '.join(_sentence(rng) for _ in range(3)),
+        'experience': [
+            {
+                'company': f"Company {i + 1}",
+                'position': rng.choice(['Engineer', 'Senior Engineer', 'Lead', 'Manager']),
+                'duration': f"{2010 + i} - {2011 + i}",
+                'responsibilities': _bullets(rng, bullets)
+            }
+            for i in range(experiences)
+        ],
+        'education': [_education(rng, i, bullets) for i in range(education)],
+        'skills': rng.sample(SKILLS, 8)
+    }
+
+
+def make_draft(size='medium', seed=0):
+    """Return the session state ResumeForm.load_draft() restores for make_user_info(size, seed)"""
+    user_info = make_user_info(size, seed)
+    personal_info = user_info['personal_info']
+    draft = {
+        'name_input': personal_info['name'],
+        'email_input': personal_info['email'],
+        'location_input': personal_info['location'],
+        'phone_number': personal_info['phone'],
+        'professional_summary': user_info['summary'],
+        'num_exp': len(user_info['experience']),
+        'num_edu': len(user_info['education']),
+        'skills_input': '\n'.join(user_info['skills'])
+    }
+    for i, exp in enumerate(user_info['experience']):
+        draft.update({
+            f'company_{i}': exp['company'],
+            f'position_{i}': exp['position'],
+            f'duration_{i}': exp['duration'],
+            f'resp_{i}': exp['responsibilities']
+        })
+    for i, edu in enumerate(user_info['education']):
+        draft.update({
+            f'inst_{i}': edu['institution'],
+            f'degree_{i}': edu['degree'],
+            f'year_{i}': edu['year'],
+            f'grade_{i}': edu['grade']
+        })
+    return draft
+
+
+def make_resume_content(size='medium', seed=0):
+    """Return already-enhanced resume content with the counts of SIZES[size]"""
+    experiences, education, bullets = SIZES[size]
+    rng = random.Random(f"content-{size}-{seed}")
+    return {
+        'name': 'Jane Doe',
+        'email': 'jane@example.com',
+        'phone': '9876543210',
+        'location': 'Pune',
+        'linkedin': 'https://linkedin.com/in/janedoe',
+        'github': 'https://github.com/janedoe',
+        'professional_summary': ' '.join(_sentence(rng) for _ in range(4)),
+        'experience': [
+            {
+                'company': f"Company {i + 1}",
+                'position': 'Senior Engineer',
+                'duration': f"{2010 + i} - {2011 + i}",
+                'achievements': _bullets(rng, bullets)
+            }
+            for i in range(experiences)
+        ],
+        'education': [_education(rng, i, bullets) for i in range(education)],
+        'skills': 'TECHNICAL: ' + ' | '.join(rng.sample(SKILLS, 8))
+    }
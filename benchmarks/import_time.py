@@ -0,0 +1,119 @@
+"""Report import times from `python -X importtime` and catch cold-start regressions.
+
+Usage:
+    python -m benchmarks.import_time                       # every target
+    python -m benchmarks.import_time --target app --top 20
+    python -m benchmarks.import_time --runs 7
+
+Each target is imported in a fresh interpreter with -X importtime and the
+"import time: self [us] | cumulative | imported package" lines on stderr are
+parsed. The report shows each target's median cumulative import time and the
+top-level packages that account for most of it. It exits with status 1 if a
+target loads a module listed for it in LAZY_MODULES: those are deferred to
+first use or to the warm-up thread, and importing them eagerly slows down the
+login page.
+The 'imports' suite of benchmarks.run compares the timings with the baseline.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ('app', 'src.auth_ui', 'src.resume_builder_ui', 'utils.ai_generator', 'utils.pdf_generator', 'api')
+
+# Modules a target must not import eagerly
+LAZY_MODULES = {
+    'app': (
+        'google.generativeai', 'reportlab', 'streamlit_pdf_viewer',
+        'src.resume_builder_ui', 'utils.ai_generator', 'utils.pdf_generator', 'utils.job_queue'
+    ),
+    'src.auth_ui': ('google.generativeai', 'reportlab', 'utils.ai_generator', 'utils.pdf_generator'),
+    'src.resume_builder_ui': ('google.generativeai', 'reportlab', 'utils.ai_generator', 'utils.pdf_generator')
+}
+
+
+def parse_importtime(output):
+    """Return {module: (self_us, cumulative_us)} from -X importtime stderr"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def import_times(target, python=sys.executable):
+    """Import target in a fresh interpreter and return its parsed import times"""
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(targets=TARGETS, runs=5):
+    """Return {target: {'ms': median cumulative ms, 'modules': parsed times of the median run}}"""
+    results = {}
+    for target in targets:
+        samples = sorted((import_times(target) for _ in range(runs)), key=lambda times: times[target][1])
+        modules = samples[len(samples) // 2]
+        results[target] = {'ms': modules[target][1] / 1000, 'modules': modules}
+    return results
+
+
+def package_times(modules):
+    """Return [(top-level package, total self us)], slowest first"""
+    totals = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def lazy_violations(target, modules):
+    """Return the modules of LAZY_MODULES[target] that importing target loaded, directly or via a submodule"""
+    return sorted(
+        module for module in LAZY_MODULES.get(target, ())
+        if any(name == module or name.startswith(module + '.') for name in modules)
+    )
+
+
+def to_metrics(results):
+    """Convert measure() output to benchmark metrics"""
+    from benchmarks.run import _metric
+
+    return {f'imports.{target}.ms': _metric(result['ms'], 'ms', 'lower') for target, result in results.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import times and eagerly imported heavy modules")
+    parser.add_argument('--target', action='append', help=f"module to import (default: {', '.join(TARGETS)})")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per target; the median is reported")
+    parser.add_argument('--top', type=int, default=10, help="slowest packages to list per target")
+    args = parser.parse_args(argv)
+
+    results = measure(args.target or TARGETS, args.runs)
+    failed = False
+    for target, result in results.items():
+        print(f"\n{target}: {result['ms']:.1f} ms")
+        for package, self_us in package_times(result['modules'])[:args.top]:
+            print(f"  {package:<32} {self_us / 1000:>8.1f} ms")
+        violations = lazy_violations(target, result['modules'])
+        if violations:
+            failed = True
+            print(f"  EAGER IMPORTS (should load on first use): {', '.join(violations)}")
+
+    if failed:
+        print("\nHeavy modules were imported eagerly; move the imports into the functions that need them")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
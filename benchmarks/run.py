@@ -0,0 +1,307 @@
+"""Benchmark the PDF, AI generation, password hashing, database, UI rerun and import hot paths.
+
+Usage:
+    python -m benchmarks.run                         # every suite, compared with the baseline
+    python -m benchmarks.run --only pdf,ai --quick
+    python -m benchmarks.run --out results.json --ai-latency 0.2
+    python -m benchmarks.run --update-baseline       # accept the current numbers
+
+Results are JSON of the form {'meta': {...}, 'results': {name: {'value',
+'unit', 'better'}}}. Each metric is compared with benchmarks/baseline.json
+and the run exits with status 1 if any metric is worse than the baseline by
+more than --tolerance. Baselines are machine specific: refresh them with
+--update-baseline when moving to a different machine.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.fixtures import SIZES, make_resume_content, make_user_info
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+SUITES = ('pdf', 'ai', 'bcrypt', 'db', 'ui', 'imports')
+
+# Absolute changes below these are timer noise and never count as regressions
+NOISE_FLOOR = {'ms': 1.0}
+
+
+def _metric(value, unit, better):
+    return {'value': round(value, 4), 'unit': unit, 'better': better}
+
+
+def _timed(func, iterations):
+    """Return per-call durations in seconds"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_pdf(args):
+    """Full render throughput, latency and peak traced memory per fixture size"""
+    from utils.pdf_cache import PDFCache
+    from utils.pdf_generator import PDFGenerator
+
+    results = {}
+    iterations = 5 if args.quick else 20
+    for size in SIZES:
+        content = make_resume_content(size)
+        PDFGenerator(reuse_flowables=False, use_cache=False).generate_pdf(content)  # warm fonts and themes
+        durations = _timed(
+            lambda: PDFGenerator(reuse_flowables=False, use_cache=False).generate_pdf(content), iterations
+        )
+
+        generator = PDFGenerator(reuse_flowables=False, use_cache=False)
+        tracemalloc.start()
+        try:
+            generator.generate_pdf(content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        results[f'pdf.{size}.renders_per_sec'] = _metric(iterations / sum(durations), '1/s', 'higher')
+        results[f'pdf.{size}.p50_ms'] = _metric(statistics.median(durations) * 1000, 'ms', 'lower')
+        results[f'pdf.{size}.peak_kib'] = _metric(peak / 1024, 'KiB', 'lower')
+        results[f'pdf.{size}.pages'] = _metric(generator.page_count, 'pages', 'lower')
+
+        # Repeat download of an unchanged resume: a rendered-PDF cache hit
+        cache = PDFCache()
+        PDFGenerator(cache=cache).generate_pdf(content)
+        durations = _timed(lambda: PDFGenerator(cache=cache).generate_pdf(content), iterations)
+        results[f'pdf.{size}.cache_hit_p50_ms'] = _metric(statistics.median(durations) * 1000, 'ms', 'lower')
+
+    # Live preview: the user edits one bullet of one job and re-renders
+    for size in ('medium', 'large'):
+        for reuse in (True, False):
+            content = make_resume_content(size)
+            PDFGenerator(reuse_flowables=reuse, use_cache=False).generate_pdf(content)
+            durations = []
+            for i in range(iterations):
+                content = copy.deepcopy(content)
+                content['experience'][i % len(content['experience'])]['achievements'] += f"\n* Edit {i}"
+                durations += _timed(
+                    lambda: PDFGenerator(reuse_flowables=reuse, use_cache=False).generate_pdf(content), 1
+                )
+            name = 'edit_p50_ms' if reuse else 'edit_uncached_p50_ms'
+            results[f'pdf.{size}.{name}'] = _metric(statistics.median(durations) * 1000, 'ms', 'lower')
+    return results
+
+
+def bench_ai(args):
+    """generate_content latency against the fake backend, cold and fully cached"""
+    from utils.ai_generator import AIGenerator
+    from utils.llm_backends import FakeBackend
+    from utils.rate_limiter import RetryPolicy
+    from utils.response_cache import ResponseCache
+
+    results = {}
+    iterations = 3 if args.quick else 10
+    backend = FakeBackend(latency=args.ai_latency, error_rate=0.0, seed=0)
+    for strategy in ('concurrent', 'batched'):
+        for size in ('small', 'large'):
+            user_info = make_user_info(size)
+            cold, warm = [], []
+            for _ in range(iterations):
+                generator = AIGenerator(cache=ResponseCache(), strategy=strategy,
+                                        retry_policy=RetryPolicy(), backend=backend)
+                cold += _timed(lambda: generator.generate_content(user_info), 1)
+                warm += _timed(lambda: generator.generate_content(user_info), 1)
+            prefix = f'ai.{strategy}.{size}'
+            results[f'{prefix}.cold_p50_ms'] = _metric(statistics.median(cold) * 1000, 'ms', 'lower')
+            results[f'{prefix}.cached_p50_ms'] = _metric(statistics.median(warm) * 1000, 'ms', 'lower')
+    return results
+
+
+def bench_bcrypt(args):
+    """bcrypt verify throughput, single-threaded and on the hashing pool"""
+    from utils.password_hasher import benchmark
+
+    results = {}
+    for row in benchmark(args.bcrypt_costs, seconds=0.5 if args.quick else 2.0):
+        prefix = f"bcrypt.cost{row['cost']}"
+        results[f'{prefix}.single_thread_per_sec'] = _metric(row['single_thread_per_sec'], '1/s', 'higher')
+        results[f'{prefix}.pooled_per_sec'] = _metric(row['pooled_per_sec'], '1/s', 'higher')
+    return results
+
+
+def _throughput(op, threads, total):
+    """Run op(i) for i in range(total) on a thread pool and return ops/sec"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(op, range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def bench_db(args):
+    """DatabaseManager operations under concurrent threads
+
+    The manager gets a minimum-cost hasher so the numbers reflect SQLite and
+    the connection pool rather than bcrypt, which has its own suite.
+    """
+    from utils.db_manager import DatabaseManager
+    from utils.password_hasher import PasswordHasher
+
+    results = {}
+    total = 200 if args.quick else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        db.hasher = PasswordHasher(rounds=4, workers=os.cpu_count() or 1, queue_limit=256)
+        for i in range(100):
+            db.create_user(f'seed{i}', 'password', f'seed{i}@example.com')
+
+        counter = iter(range(10 ** 9))
+        counter_lock = threading.Lock()
+
+        def create(_):
+            with counter_lock:
+                n = next(counter)
+            db.create_user(f'user{n}', 'password', f'user{n}@example.com')
+
+        operations = {
+            'user_exists': lambda i: db.user_exists(username=f'seed{i % 100}'),
+            'verify_user': lambda i: db.verify_user(f'seed{i % 100}', 'password'),
+            'create_user': create
+        }
+        for threads in (1, 8):
+            for name, op in operations.items():
+                ops_per_sec = _throughput(op, threads, total)
+                results[f'db.{name}.threads{threads}.ops_per_sec'] = _metric(ops_per_sec, '1/s', 'higher')
+        db.pool.close_all()
+    return results
+
+
+def bench_ui(args):
+    """Streamlit rerun CPU per form interaction, see benchmarks/ui_reruns.py"""
+    from benchmarks.ui_reruns import measure, to_metrics
+
+    return to_metrics(measure(iterations=5 if args.quick else 20))
+
+
+def bench_imports(args):
+    """Cold-start import time of the entry points, see benchmarks/import_time.py"""
+    from benchmarks.import_time import measure, to_metrics
+
+    return to_metrics(measure(runs=3 if args.quick else 7))
+
+
+BENCHMARKS = {
+    'pdf': bench_pdf,
+    'ai': bench_ai,
+    'bcrypt': bench_bcrypt,
+    'db': bench_db,
+    'ui': bench_ui,
+    'imports': bench_imports
+}
+
+
+def run(suites, args, report=print):
+    results = {}
+    for suite in suites:
+        report(f"Running {suite} benchmarks...")
+        start = time.perf_counter()
+        results.update(BENCHMARKS[suite](args))
+        report(f"  done in {time.perf_counter() - start:.1f}s")
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'quick': args.quick,
+            'ai_latency': args.ai_latency
+        },
+        'results': results
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return [(name, baseline, current, change, regressed)] for metrics present in both"""
+    rows = []
+    for name, current in sorted(results['results'].items()):
+        previous = baseline['results'].get(name)
+        if previous is None or not previous['value']:
+            continue
+        delta = current['value'] - previous['value']
+        change = delta / previous['value']
+        if abs(delta) < NOISE_FLOOR.get(current['unit'], 0.0):
+            regressed = False
+        elif current['better'] == 'higher':
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        rows.append((name, previous['value'], current['value'], change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume builder hot paths")
+    parser.add_argument('--only', default=','.join(SUITES), help=f"comma-separated suites from {', '.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations, for a fast smoke run")
+    parser.add_argument('--ai-latency', type=float, default=0.05, help="fake model latency per call in seconds")
+    parser.add_argument('--bcrypt-costs', default='10,12', help="comma-separated bcrypt costs")
+    parser.add_argument('--out', help="write the JSON results to this file")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument('--update-baseline', action='store_true', help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+    args.bcrypt_costs = [int(cost) for cost in args.bcrypt_costs.split(',')]
+
+    suites = [suite.strip() for suite in args.only.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault('LLM_BACKEND', 'fake')  # benchmarks never call a real model
+    results = run(suites, args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {'meta': results['meta'], 'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline['results'] = json.load(f)['results']
+        baseline['results'].update(results['results'])
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results['results'], indent=2))
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    print(f"\n{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, previous, current, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:<44} {previous:>12.2f} {current:>12.2f} {change:>+8.1%}{flag}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} ({len(rows)} metrics compared)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Measure the server CPU each resume builder interaction costs in Streamlit reruns.
+
+Usage:
+    python -m benchmarks.ui_reruns
+    python -m benchmarks.ui_reruns --app /path/to/other/checkout/app.py   # before/after
+
+Drives app.py with streamlit's AppTest, logged in and with a large draft
+(10 jobs, 5 degrees) loaded. For each tab it edits one field, then applies
+the edit (Save for tabs that batch their fields in a form), and records the
+process CPU time of the reruns that causes: the whole script, or only the
+tab when the tab is a fragment. Edits inside a form cost nothing until Save.
+
+AppTest only runs whole scripts, so FragmentRunner queues the fragment id
+the way the browser does for a widget inside a fragment. That relies on
+streamlit internals with no public API (LocalScriptRunner, ScriptRequests,
+AppTest's tree and fragment storage), so the harness is pinned to the
+streamlit releases in TESTED_STREAMLIT and refuses to run on others:
+    pip install 'streamlit==1.65.*'
+"""
+import argparse
+import dataclasses
+import inspect
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.fixtures import make_draft
+
+APP_PATH = Path(__file__).resolve().parent.parent / 'app.py'
+
+# major.minor releases whose private script runner API the harness was checked against
+TESTED_STREAMLIT = ('1.65',)
+
+# tab: (section render method, widget edited)
+TABS = {
+    'personal_info': ('render_personal_info', 'name_input'),
+    'summary': ('render_professional_summary', 'summary_input'),
+    'experience': ('render_experience', 'resp_9'),
+    'education': ('render_education', 'degree_4'),
+    'skills': ('render_skills', 'skills_input')
+}
+
+
+def check_streamlit_version():
+    """Raise RuntimeError unless the installed streamlit is one the harness was checked against"""
+    import streamlit
+
+    version = '.'.join(streamlit.__version__.split('.')[:2])
+    if version not in TESTED_STREAMLIT:
+        raise RuntimeError(
+            f"benchmarks.ui_reruns uses streamlit internals checked against "
+            f"{', '.join(v + '.x' for v in TESTED_STREAMLIT)}, found {streamlit.__version__}: "
+            f"install a tested release or update the harness and TESTED_STREAMLIT"
+        )
+
+
+def _fragment_runner():
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    class FragmentRunner(LocalScriptRunner):
+        """LocalScriptRunner that reruns only fragment_id when it is set"""
+        fragment_id = None
+
+        def request_rerun(self, rerun_data):
+            if FragmentRunner.fragment_id:
+                # Replace the full rerun queued by __init__, which would absorb this one
+                self._requests = ScriptRequests()
+                rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[FragmentRunner.fragment_id])
+            return super().request_rerun(rerun_data)
+
+    return FragmentRunner
+
+
+def _fragment_ids(at):
+    """Map the name of each registered fragment's method to the fragment id"""
+    ids = {}
+    for fragment_id, wrapped in at._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            if inspect.ismethod(cell.cell_contents):
+                ids[cell.cell_contents.__name__] = fragment_id
+    return ids
+
+
+def _find(tree, key):
+    for kind in ('text_input', 'text_area'):
+        for widget in getattr(tree, kind):
+            if widget.key == key:
+                return widget
+    raise KeyError(key)
+
+
+def measure(app_path=APP_PATH, iterations=20):
+    """Return {'full_app': seconds, tab: {'edit': seconds, 'apply': seconds, 'fragment': bool}}"""
+    check_streamlit_version()
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1 import app_test
+
+    # Prefetches triggered by edits are part of the cost, but against the fake model;
+    # no effect if the settings were already imported
+    os.environ.setdefault('LLM_BACKEND', 'fake')
+    os.environ.setdefault('WARMUP_ON_START', 'false')
+
+    app_path = Path(app_path).resolve()
+    runner = _fragment_runner()
+    cwd = os.getcwd()
+    sys.path.insert(0, str(app_path.parent))
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(app_test, 'LocalScriptRunner', runner):
+        # Relative database paths land in the scratch directory
+        os.chdir(tmp)
+        try:
+            at = AppTest.from_file(str(app_path), default_timeout=60)
+            at.session_state.logged_in = True
+            at.session_state.username = 'bench'
+            at.session_state.draft_loaded = 'bench'
+            for key, value in make_draft('large').items():
+                at.session_state[key] = value
+            at.run()
+
+            def rerun(tree, fragment_id=None):
+                runner.fragment_id = fragment_id
+                start = time.process_time()
+                try:
+                    at._run(tree.get_widget_states())
+                finally:
+                    runner.fragment_id = None
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+                return time.process_time() - start
+
+            tree = at._tree
+            results = {'full_app': statistics.median(rerun(tree) for _ in range(iterations))}
+            fragments = _fragment_ids(at)
+            for tab, (method, key) in TABS.items():
+                # Interact through a tree from a full run, like the browser, which
+                # sends every widget's state with each rerun
+                rerun(tree)
+                tree = at._tree
+                fragment_id = fragments.get(method)
+                widget = _find(tree, key)
+                save = next((button for button in tree.button
+                             if widget.form_id and button.form_id == widget.form_id), None)
+                edits, applies = [], []
+                for i in range(iterations):
+                    widget.set_value(f"{widget.value} {i}")
+                    if save is None:
+                        edits.append(rerun(tree, fragment_id))
+                        applies.append(edits[-1])
+                    else:
+                        edits.append(0.0)  # held by the form until Save
+                        save.click()
+                        applies.append(rerun(tree, fragment_id))
+                results[tab] = {
+                    'edit': statistics.median(edits),
+                    'apply': statistics.median(applies),
+                    'fragment': fragment_id is not None
+                }
+            return results
+        finally:
+            os.chdir(cwd)
+            sys.path.remove(str(app_path.parent))
+
+
+def to_metrics(results):
+    """Convert measure() output to benchmark metrics"""
+    from benchmarks.run import _metric
+
+    metrics = {
+        'ui.full_app.cpu_ms': _metric(results['full_app'] * 1000, 'ms', 'lower'),
+        'ui.full_app.reruns_per_sec_per_core': _metric(1 / results['full_app'], '1/s', 'higher')
+    }
+    for tab in TABS:
+        metrics[f'ui.{tab}.edit_cpu_ms'] = _metric(results[tab]['edit'] * 1000, 'ms', 'lower')
+        metrics[f'ui.{tab}.apply_cpu_ms'] = _metric(results[tab]['apply'] * 1000, 'ms', 'lower')
+        metrics[f'ui.{tab}.reruns_per_sec_per_core'] = _metric(1 / results[tab]['apply'], '1/s', 'higher')
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure rerun CPU cost per resume builder interaction")
+    parser.add_argument('--app', default=str(APP_PATH), help="app.py of the checkout to measure")
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    results = measure(args.app, args.iterations)
+    print(f"{'tab':<16} {'scope':>9} {'edit ms':>9} {'apply ms':>9} {'reruns/s/core':>14}")
+    print(f"{'(whole app)':<16} {'app':>9} {results['full_app'] * 1000:>9.1f} {results['full_app'] * 1000:>9.1f} "
+          f"{1 / results['full_app']:>14.1f}")
+    for tab in TABS:
+        row = results[tab]
+        scope = 'fragment' if row['fragment'] else 'app'
+        print(f"{tab:<16} {scope:>9} {row['edit'] * 1000:>9.1f} {row['apply'] * 1000:>9.1f} "
+              f"{1 / row['apply']:>14.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
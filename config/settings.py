@@ -1,15 +1,91 @@
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Load environment variables
-load_dotenv()
+
+def _find_dotenv():
+    """Return the nearest .env in this directory or its parents, as load_dotenv() searches"""
+    for directory in Path(__file__).resolve().parents:
+        path = directory / '.env'
+        if path.is_file():
+            return path
+    return None
+
+
+# Load environment variables; python-dotenv is only imported when there is a file to load
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 # API Configuration
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
+# LLM Backend Settings
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')  # 'gemini' or 'fake' (offline, deterministic)
+LLM_MODEL_NAME = os.getenv('LLM_MODEL_NAME', 'gemini-pro')
+FAKE_LLM_LATENCY = float(os.getenv('FAKE_LLM_LATENCY', 0.0))  # seconds per call
+FAKE_LLM_ERROR_RATE = float(os.getenv('FAKE_LLM_ERROR_RATE', 0.0))  # fraction of calls failing with a 429
+FAKE_LLM_SEED = int(os.getenv('FAKE_LLM_SEED', 0))
+
+# AI Generation Settings
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 4))  # 1 = sequential calls
+AI_GENERATION_STRATEGY = os.getenv('AI_GENERATION_STRATEGY', 'concurrent')  # 'concurrent' or 'batched'
+
+# AI Rate Limiting Settings (shared by every session in the process)
+AI_RATE_LIMIT_PER_MINUTE = float(os.getenv('AI_RATE_LIMIT_PER_MINUTE', 60))
+AI_RATE_LIMIT_BURST = int(os.getenv('AI_RATE_LIMIT_BURST', 10))
+AI_MAX_ATTEMPTS = int(os.getenv('AI_MAX_ATTEMPTS', 5))
+AI_RETRY_BASE_DELAY = float(os.getenv('AI_RETRY_BASE_DELAY', 1.0))  # seconds
+AI_RETRY_MAX_DELAY = float(os.getenv('AI_RETRY_MAX_DELAY', 20.0))  # seconds
+AI_RETRY_DEADLINE = float(os.getenv('AI_RETRY_DEADLINE', 60.0))  # seconds per call
+
+# AI Response Cache Settings
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 512))
+AI_CACHE_TTL_SECONDS = int(os.getenv('AI_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+AI_CACHE_DB_PATH = os.getenv('AI_CACHE_DB_PATH')  # e.g. 'users.db'; unset = memory only
+
+# Speculative Prefetch Settings (sections are enhanced in the background as soon as they are complete)
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', 2))  # concurrent speculative model calls per node
+
+# Background Generation Job Settings
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # max concurrent generations on this node
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 24 * 3600))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))  # seconds between UI status checks
+JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', 5.0))  # seconds between liveness updates
+JOB_HEARTBEAT_TIMEOUT = float(os.getenv('JOB_HEARTBEAT_TIMEOUT', 60.0))  # silence after which a running job is re-queued
+
+# HTTP API Settings (api.py)
+API_MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', 8))  # generation/render requests in flight
+API_QUEUE_TIMEOUT = float(os.getenv('API_QUEUE_TIMEOUT', 10.0))  # seconds to wait for a slot before a 503
+API_RENDER_WORKERS = int(os.getenv('API_RENDER_WORKERS', os.cpu_count() or 1))  # PDF render processes
+API_MAX_BODY_BYTES = int(os.getenv('API_MAX_BODY_BYTES', 1024 * 1024))
+
+# Password Hashing Settings
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # stored hashes at another cost are rehashed on login
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 32))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0))  # seconds
+
+# Metrics Settings
+METRICS_PORT = int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None  # unset = no /metrics server
+METRICS_ADMIN_USERS = [user.strip() for user in os.getenv('METRICS_ADMIN_USERS', '').split(',') if user.strip()]
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+# Startup Settings
+WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'true').lower() == 'true'  # preload AI/PDF deps in the background
+
 # PDF Settings
 PDF_MARGINS = 72  # 1 inch in points
 PAGE_SIZE = 'letter'
+PDF_TEMPLATE = os.getenv('PDF_TEMPLATE', 'default')  # a config/templates/<name>.json layout
+PDF_TEMPLATE_DIR = os.getenv('PDF_TEMPLATE_DIR', os.path.join(os.path.dirname(__file__), 'templates'))
+PDF_FLOWABLE_CACHE_SIZE = int(os.getenv('PDF_FLOWABLE_CACHE_SIZE', 128))  # built sections kept per render thread
+
+# Rendered PDF Cache Settings
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # in-process tier
+PDF_CACHE_DB_PATH = os.getenv('PDF_CACHE_DB_PATH')  # e.g. 'users.db'; unset = memory only
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv('PDF_CACHE_DISK_MAX_BYTES', 512 * 1024 * 1024))
 
 # Font Settings
 FONT_SIZES = {
@@ -0,0 +1,50 @@
+import streamlit as st
+from config.settings import METRICS_ADMIN_USERS
+from utils import metrics
+
+
+class AdminUI:
+    """Sidebar panel with pipeline latency and counters for admin users"""
+
+    def is_admin(self, username):
+        return username in METRICS_ADMIN_USERS
+
+    def render_metrics_panel(self):
+        snapshot = metrics.REGISTRY.snapshot()
+        with st.expander("📊 Metrics"):
+            if snapshot['histograms']:
+                st.caption("Latency (ms)")
+                st.dataframe([
+                    {
+                        'metric': histogram['name'],
+                        'labels': self._format_labels(histogram['labels']),
+                        'count': histogram['count'],
+                        'p50': round(histogram['p50'] * 1000, 1),
+                        'p95': round(histogram['p95'] * 1000, 1),
+                        'p99': round(histogram['p99'] * 1000, 1)
+                    }
+                    for histogram in snapshot['histograms']
+                ], hide_index=True)
+
+            counters = snapshot['counters'] + snapshot['collected']
+            if counters:
+                st.caption("Counters")
+                st.dataframe([
+                    {
+                        'metric': counter['name'],
+                        'labels': self._format_labels(counter['labels']),
+                        'value': counter['value']
+                    }
+                    for counter in counters
+                ], hide_index=True)
+
+            st.download_button(
+                "Download (Prometheus)",
+                data=metrics.REGISTRY.render_prometheus(),
+                file_name="metrics.txt",
+                mime="text/plain"
+            )
+
+    @staticmethod
+    def _format_labels(labels):
+        return ', '.join(f"{name}={value}" for name, value in labels.items())
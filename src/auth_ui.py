@@ -1,15 +1,17 @@
 import streamlit as st
-import json
-import os
-import bcrypt
 from pathlib import Path
+from src.ui_components import ResumeForm
+from utils.db_manager import DatabaseManager, migrate_json_users
+from utils.password_hasher import HasherBusyError
+
+LEGACY_USERS_FILE = Path("data/users.json")
 
 class AuthUI:
     def __init__(self):
-        self.users_file = Path("data/users.json")
-        self.users_file.parent.mkdir(exist_ok=True)
-        if not self.users_file.exists():
-            self.users_file.write_text("{}")
+        self.db = DatabaseManager()
+        # Move any users left in the legacy JSON store into the database (runs once)
+        if LEGACY_USERS_FILE.exists():
+            migrate_json_users(str(LEGACY_USERS_FILE), self.db.db_path)
         
     def initialize_session_state(self):
         """Initialize session state variables"""
@@ -24,44 +26,11 @@ class AuthUI:
             
     def verify_user(self, username, password):
         """Verify user credentials"""
-        try:
-            with open(self.users_file, "r") as f:
-                users = json.load(f)
-            
-            if username in users:
-                stored_password = users[username]["password"].encode('utf-8')
-                return bcrypt.checkpw(password.encode('utf-8'), stored_password)
-            return False
-        except Exception as e:
-            st.error(f"Error verifying user: {str(e)}")
-            return False
+        return self.db.verify_user(username, password)
             
     def create_user(self, username, password, email):
-        """Create a new user"""
-        try:
-            with open(self.users_file, "r") as f:
-                users = json.load(f)
-            
-            # Check if username or email already exists
-            for user_data in users.values():
-                if user_data.get("email") == email:
-                    return False
-            
-            if username not in users:
-                # Hash the password
-                hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                users[username] = {
-                    "password": hashed.decode('utf-8'),
-                    "email": email
-                }
-                
-                with open(self.users_file, "w") as f:
-                    json.dump(users, f, indent=4)
-                return True
-            return False
-        except Exception as e:
-            st.error(f"Error creating user: {str(e)}")
-            return False
+        """Create a new user; fails if the username or email is already taken"""
+        return self.db.create_user(username, password, email)
     
     def clear_form(self):
         """Clear registration form fields"""
@@ -85,12 +54,17 @@ class AuthUI:
                     password = st.text_input("Password", type="password", key="login_password")
                     
                     if st.button("Login", use_container_width=True):
-                        if self.verify_user(username, password):
+                        try:
+                            valid = self.verify_user(username, password)
+                        except HasherBusyError:
+                            st.warning("The server is busy right now. Please try again in a moment.")
+                            valid = None
+                        if valid:
                             st.session_state.logged_in = True
                             st.session_state.username = username
                             st.success("Successfully logged in!")
                             st.rerun()
-                        else:
+                        elif valid is False:
                             st.error("Invalid username or password")
             
             # Registration tab
@@ -107,10 +81,15 @@ class AuthUI:
                         elif reg_password != reg_confirm_password:
                             st.error("Passwords do not match")
                         else:
-                            if self.create_user(reg_username, reg_password, reg_email):
+                            try:
+                                created = self.create_user(reg_username, reg_password, reg_email)
+                            except HasherBusyError:
+                                st.warning("The server is busy right now. Please try again in a moment.")
+                                created = None
+                            if created:
                                 st.success("Registration successful! Please login.")
                                 self.clear_form()
-                            else:
+                            elif created is False:
                                 st.error("Username or email already exists")
 
     def show_logout_button(self):
@@ -118,5 +97,12 @@ class AuthUI:
         if st.button("Logout"):
             st.session_state.logged_in = False
             st.session_state.username = None
+            # The next user to log in on this browser session must not see this one's job
+            st.session_state.generation_job = None
+            st.session_state.generation_progress = 0.0
+            st.session_state.generation_status = ""
+            # ...nor start from this one's form values or skip loading their own draft
+            ResumeForm.clear_state()
+            st.session_state.active_tab = 0
             return True
         return False
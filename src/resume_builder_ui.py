@@ -1,12 +1,23 @@
 import streamlit as st
 from src.ui_components import ResumeForm
-from utils.ai_generator import AIGenerator
-from utils.pdf_generator import PDFGenerator
+from config.settings import JOB_POLL_INTERVAL, PREFETCH_ENABLED
+from utils.job_queue import ACTIVE_STATUSES, get_job_queue
+from utils.prefetch import get_prefetcher
+from utils.rate_limiter import RateLimitError
+from utils.resume_store import ResumeStore
 
 class ResumeBuilderUI:
     def __init__(self):
-        self.form = ResumeForm()
-        self.ai_generator = AIGenerator()
+        self.store = ResumeStore()
+        # The user's saved draft is restored once per login, before any widget renders;
+        # keyed by username so a different user never starts from someone else's form
+        new_login = st.session_state.get('draft_loaded') != st.session_state.username
+        if new_login:
+            ResumeForm.clear_state()
+        self.form = ResumeForm(
+            on_next=self.save_draft,
+            on_section_change=self.prefetch_section if PREFETCH_ENABLED else None
+        )
         self.tab_titles = [
             "Personal Info",
             "Professional Summary",
@@ -20,6 +31,30 @@ class ResumeBuilderUI:
             st.session_state.active_tab = 0
         if 'generation_status' not in st.session_state:
             st.session_state.generation_status = ""
+        if 'generation_progress' not in st.session_state:
+            st.session_state.generation_progress = 0.0
+        if 'generation_job' not in st.session_state:
+            st.session_state.generation_job = None
+        if new_login:
+            self.form.load_draft(self.store.load_draft(st.session_state.username))
+            st.session_state.draft_loaded = st.session_state.username
+
+    @property
+    def jobs(self):
+        """Process-wide generation job queue"""
+        return get_job_queue()
+
+    def save_draft(self):
+        """Persist the current form fields for the logged-in user"""
+        self.store.save_draft(st.session_state.username, self.form.get_draft())
+
+    def prefetch_section(self, slot, section, args):
+        """Enhance a completed section in the background, so generation finds it in the cache"""
+        prefetcher = get_prefetcher()
+        if args is None:
+            prefetcher.cancel(st.session_state.username, slot)
+        else:
+            prefetcher.schedule(st.session_state.username, slot, section, *args)
 
     def switch_tab(self, tab_index):
         st.session_state.active_tab = tab_index
@@ -30,26 +65,40 @@ class ResumeBuilderUI:
         st.session_state.generation_progress = progress
         st.session_state.generation_status = status
 
-    def render_pdf_preview(self, pdf_filename, resume_content):
+    def render_live_preview(self, user_info, partial):
+        """Show the section text generated so far for a running job"""
+        if not partial:
+            return
+        st.write("### Live Preview")
+        if partial['summary']:
+            st.markdown(partial['summary'])
+        for i, exp in enumerate(user_info['experience']):
+            text = partial['experience'].get(i)
+            if text:
+                st.markdown(f"**{exp['company']} - {exp['position']}**")
+                st.markdown(text)
+        if partial['skills']:
+            st.markdown(partial['skills'])
+
+    def render_pdf_preview(self, pdf_bytes, pdf_filename, resume_content):
         st.write("### Download and Preview")
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col2:
-            # Download button
-            with open(pdf_filename, "rb") as file:
-                st.download_button(
-                    label="📥 Download Resume PDF",
-                    data=file,
-                    file_name=pdf_filename,
-                    mime="application/pdf",
-                    key="download_resume"
-                )
+            # Download button, served straight from the in-memory PDF
+            st.download_button(
+                label="📥 Download Resume PDF",
+                data=pdf_bytes,
+                file_name=pdf_filename,
+                mime="application/pdf",
+                key="download_resume"
+            )
             
             st.write("---")
             st.write("### Resume Preview")
             try:
                 from streamlit_pdf_viewer import pdf_viewer
-                pdf_viewer(pdf_filename)
+                pdf_viewer(pdf_bytes)
             except Exception:
                 st.write("Resume Content Preview:")
                 st.write(resume_content)
@@ -65,26 +114,60 @@ class ResumeBuilderUI:
                 self.switch_tab(0)  
         
         if st.button("Generate Resume", type="primary", key="generate"):
-            try:
-                # Get form data
-                user_info = self.form.get_form_data()
-                
-                with st.spinner("Generating your resume..."):
-                    # Generate resume content using AI
-                    resume_content = self.ai_generator.generate_content(user_info)
-                    
-                    # Create PDF
-                    pdf_filename = f"generated_resume_{st.session_state.username}.pdf"
-                    pdf_gen = PDFGenerator(pdf_filename)
-                    pdf_gen.generate_pdf(resume_content)
-                    
-                    # Show success message and download button
-                    st.success("✨ Resume generated successfully!")
-                    self.render_pdf_preview(pdf_filename, resume_content)
-                    
-            except Exception as e:
-                st.error(f"An error occurred while generating the resume: {str(e)}")
-                st.session_state.generation_status = "Generation failed"
+            # Get form data and hand the work to a background worker, so a rerun
+            # or a closed tab doesn't lose it
+            user_info = self.form.get_form_data()
+            self.save_draft()
+            self.update_progress(0.0, "Waiting for a free worker...")
+            st.session_state.generation_job = self.jobs.submit(st.session_state.username, user_info)
+        
+        if st.session_state.get('generation_job'):
+            job = self.current_job()
+            active = job is not None and job['status'] in ACTIVE_STATUSES
+            # Poll only while the job is running; the fragment reruns on its own
+            st.fragment(run_every=JOB_POLL_INTERVAL if active else None)(self.render_job_status)(active)
+
+    def current_job(self):
+        """Return the session's generation job, dropping it if it is gone or belongs to another user"""
+        job = self.jobs.get(st.session_state.generation_job)
+        if job is None or job['username'] != st.session_state.username:
+            st.session_state.generation_job = None
+            return None
+        return job
+
+    def render_job_status(self, polling):
+        """Render the progress or result of the session's generation job"""
+        job = self.current_job()
+        if job is None:
+            return
+        job_id = job['id']
+
+        if job['status'] in ACTIVE_STATUSES:
+            self.update_progress(job['progress'], job['message'])
+            st.progress(st.session_state.generation_progress, text=st.session_state.generation_status)
+            self.render_live_preview(job['user_info'], job['partial'])
+            return
+
+        if polling:
+            # Finished while this fragment was polling; rerun the app to stop polling
+            st.rerun()
+
+        if job['status'] == 'failed':
+            self.update_progress(0.0, "Generation failed")
+            if job['error_type'] == RateLimitError.__name__:
+                st.warning("The AI service is busy right now. Please try again in a minute.")
+            else:
+                st.error(f"An error occurred while generating the resume: {job['error']}")
+            return
+
+        self.update_progress(1.0, job['message'])
+        if job['reused_sections']:
+            st.caption(f"Reused {job['reused_sections']} unchanged section(s) from your last generation")
+        
+        # Show success message and download button
+        st.success("✨ Resume generated successfully!")
+        pdf_filename = f"generated_resume_{st.session_state.username}.pdf"
+        self.render_pdf_preview(self.jobs.get_pdf(job_id), pdf_filename, job['resume_content'])
 
     def render(self):
         st.title("AI-Powered Resume Builder")
@@ -94,32 +177,18 @@ class ResumeBuilderUI:
         if 'active_tab' not in st.session_state:
             st.session_state.active_tab = 0
         
-        # Create tabs
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(self.tab_titles)
-        
-        # Personal Info tab
-        with tab1:
-            self.form.render_personal_info()
-        
-        # Professional Summary tab
-        with tab2:
-            self.form.render_professional_summary()
-        
-        # Experience tab
-        with tab3:
-            self.form.render_experience()
-        
-        # Education tab
-        with tab4:
-            self.form.render_education()
-        
-        # Skills tab
-        with tab5:
-            self.form.render_skills()
-        
-        # Generate Resume tab
-        with tab6:
-            self.render_generate_section()
+        sections = [
+            self.form.render_personal_info,
+            self.form.render_professional_summary,
+            self.form.render_experience,
+            self.form.render_education,
+            self.form.render_skills,
+            self.render_generate_section
+        ]
+        for tab, render_section in zip(st.tabs(self.tab_titles), sections):
+            with tab:
+                # Each tab is a fragment, so editing it reruns only that tab
+                st.fragment(render_section)()
         
         # Update tab selection using JavaScript
         if st.session_state.active_tab > 0:
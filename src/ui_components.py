@@ -1,12 +1,25 @@
 import streamlit as st
 
 class ResumeForm:
-    def __init__(self):
-        self.personal_info = {}
-        self.experiences = []
-        self.education = []
-        self.skills = ""
-        self.summary = ""
+    # Session state keys that make up a saved draft (per-entry keys are added in get_draft)
+    DRAFT_KEYS = [
+        'name_input', 'email_input', 'location_input', 'phone_number',
+        'linkedin_input', 'github_input', 'website_input',
+        'professional_summary', 'num_exp', 'num_edu', 'skills_input'
+    ]
+    EXPERIENCE_KEYS = ['company', 'position', 'duration', 'resp']
+    EDUCATION_KEYS = ['inst', 'degree', 'year', 'grade']
+    MAX_EXPERIENCES = 10
+    MAX_EDUCATION = 5
+    # Widget and bookkeeping keys that hold form values but aren't saved in drafts
+    EXTRA_KEYS = ['phone_input_field', 'summary_input', 'last_valid_phone', 'draft_loaded']
+
+    def __init__(self, on_next=None, on_section_change=None):
+        # Optional callback run whenever the user moves on to the next tab
+        self.on_next = on_next
+        # Optional callback run with (slot, section, args) for the AI-enhanced sections
+        # each time their tab renders; args is None while the section is incomplete
+        self.on_section_change = on_section_change
         if 'phone_number' not in st.session_state:
             st.session_state.phone_number = ""
         if 'active_tab' not in st.session_state:
@@ -22,8 +35,49 @@ class ResumeForm:
         pattern = r'^[6-9][0-9]{9}$'
         return bool(re.match(pattern, number))
 
+    def get_draft(self):
+        """Return the current form field values so they can be saved"""
+        state = st.session_state
+        draft = {key: state[key] for key in self.DRAFT_KEYS if key in state}
+        if state.get('phone_input_field'):
+            draft['phone_number'] = state['phone_input_field']
+        for i in range(state.get('num_exp', 0)):
+            draft.update({f"{key}_{i}": state[f"{key}_{i}"] for key in self.EXPERIENCE_KEYS if f"{key}_{i}" in state})
+        for i in range(state.get('num_edu', 0)):
+            draft.update({f"{key}_{i}": state[f"{key}_{i}"] for key in self.EDUCATION_KEYS if f"{key}_{i}" in state})
+        return draft
+
+    def load_draft(self, draft):
+        """Restore saved field values; must run before the form widgets are rendered"""
+        for key, value in (draft or {}).items():
+            st.session_state[key] = value
+
+    @classmethod
+    def clear_state(cls):
+        """Remove every form value from the session, e.g. when the user logs out"""
+        keys = cls.DRAFT_KEYS + cls.EXTRA_KEYS
+        keys += [f"{key}_{i}" for key in cls.EXPERIENCE_KEYS for i in range(cls.MAX_EXPERIENCES)]
+        keys += [f"{key}_{i}" for key in cls.EDUCATION_KEYS for i in range(cls.MAX_EDUCATION)]
+        for key in keys:
+            st.session_state.pop(key, None)
+
+    def notify_section(self, slot, section, args):
+        if self.on_section_change:
+            self.on_section_change(slot, section, args)
+
+    def notify_summary_and_skills(self):
+        """Report the skills section, and the summary, whose prompt also uses the skills"""
+        summary = st.session_state.get('professional_summary', '')
+        skills = self.get_skills()
+        skills_complete = any(skill.strip() for skill in skills)
+        self.notify_section('skills', 'skills', (skills,) if skills_complete else None)
+        summary_complete = skills_complete and summary.strip()
+        self.notify_section('summary', 'summary', (summary, skills) if summary_complete else None)
+
     def check_and_switch_tab(self, current_tab):
         """Helper function to switch to next tab"""
+        if self.on_next:
+            self.on_next()
         st.session_state.active_tab = current_tab + 1
         st.rerun()
 
@@ -45,65 +99,52 @@ class ResumeForm:
     def render_personal_info(self):
         st.header("Personal Information")
         
-        # Basic info in two columns
-        col1, col2 = st.columns(2)
-        with col1:
-            name = st.text_input("Full Name", key="name_input")
-            email = st.text_input("Email", key="email_input")
-            location = st.text_input("Location", key="location_input")
-        with col2:
-            phone_input = st.text_input(
-                "Phone Number",
-                value=st.session_state.get('phone_number', ''),
-                max_chars=10,
-                help="Enter a valid 10-digit Indian mobile number (starting with 6-9)",
-                key="phone_input_field"
-            )
-        
-        # Professional profiles section
-        st.subheader("Professional Profiles")
-        col3, col4 = st.columns(2)
-        with col3:
-            linkedin = st.text_input(
-                "LinkedIn Profile",
-                help="Enter your LinkedIn profile URL",
-                placeholder="https://linkedin.com/in/username",
-                key="linkedin_input"
-            )
-            github = st.text_input(
-                "GitHub Profile",
-                help="Enter your GitHub profile URL",
-                placeholder="https://github.com/username",
-                key="github_input"
-            )
-        with col4:
-            website = st.text_input(
-                "Personal Website",
-                help="Enter your personal website URL",
-                placeholder="https://example.com",
-                key="website_input"
-            )
-
-        # Process phone input and validate all fields
-        is_valid = False
-        if phone_input and name and email and location:
-            digits_only = ''.join(filter(str.isdigit, phone_input))
-            
-            if digits_only != phone_input:
-                st.session_state.phone_number = digits_only
-                st.rerun()
+        # Fields are batched in a form so typing doesn't rerun anything until Save
+        with st.form("personal_info_form", border=False):
+            # Basic info in two columns
+            col1, col2 = st.columns(2)
+            with col1:
+                st.text_input("Full Name", key="name_input")
+                st.text_input("Email", key="email_input")
+                st.text_input("Location", key="location_input")
+            with col2:
+                st.text_input(
+                    "Phone Number",
+                    value=st.session_state.get('phone_number', ''),
+                    max_chars=10,
+                    help="Enter a valid 10-digit Indian mobile number (starting with 6-9)",
+                    key="phone_input_field"
+                )
             
-            if self.validate_indian_phone(digits_only):
-                # Store all personal info including professional profiles
-                self.personal_info = {
-                    "name": name,
-                    "email": email,
-                    "location": location,
-                    "phone": digits_only,
-                    "linkedin": linkedin if linkedin else "",
-                    "github": github if github else "",
-                    "website": website if website else ""
-                }
+            # Professional profiles section
+            st.subheader("Professional Profiles")
+            col3, col4 = st.columns(2)
+            with col3:
+                st.text_input(
+                    "LinkedIn Profile",
+                    help="Enter your LinkedIn profile URL",
+                    placeholder="https://linkedin.com/in/username",
+                    key="linkedin_input"
+                )
+                st.text_input(
+                    "GitHub Profile",
+                    help="Enter your GitHub profile URL",
+                    placeholder="https://github.com/username",
+                    key="github_input"
+                )
+            with col4:
+                st.text_input(
+                    "Personal Website",
+                    help="Enter your personal website URL",
+                    placeholder="https://example.com",
+                    key="website_input"
+                )
+            st.form_submit_button("Save")
+
+        state = st.session_state
+        is_valid = False
+        if all(state.get(key) for key in ('phone_input_field', 'name_input', 'email_input', 'location_input')):
+            if self.get_personal_info():
                 st.success("✓ All required fields complete")
                 is_valid = True
             else:
@@ -122,11 +163,11 @@ class ResumeForm:
         
         is_valid = False
         if summary and len(summary.strip()) > 0:
-            self.summary = summary
             st.session_state.professional_summary = summary  # Save to session state
             st.success("✓ Summary complete")
             is_valid = True
         
+        self.notify_summary_and_skills()
         self.render_next_button(1, is_valid)
 
     def render_experience(self):
@@ -134,43 +175,38 @@ class ResumeForm:
         num_experiences = st.number_input(
             "Number of work experiences",
             min_value=0,
-            max_value=10,
-            value=0,
+            max_value=self.MAX_EXPERIENCES,
             key="num_exp"
         )
         
-        experiences = []
-        all_fields_filled = True
+        if num_experiences > 0:
+            # Entries are batched in a form so typing doesn't rerun anything until Save
+            with st.form("experience_form", border=False):
+                for i in range(num_experiences):
+                    st.subheader(f"Experience {i+1}")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.text_input(f"Company Name #{i+1}", key=f"company_{i}")
+                        st.text_input(f"Position #{i+1}", key=f"position_{i}")
+                    with col2:
+                        st.text_input(f"Duration #{i+1} (e.g., 2020-2022)", key=f"duration_{i}")
+                    st.text_area(f"Key Responsibilities #{i+1}", key=f"resp_{i}")
+                st.form_submit_button("Save")
         
-        for i in range(num_experiences):
-            st.subheader(f"Experience {i+1}")
-            col1, col2 = st.columns(2)
-            with col1:
-                company = st.text_input(f"Company Name #{i+1}", key=f"company_{i}")
-                position = st.text_input(f"Position #{i+1}", key=f"position_{i}")
-            with col2:
-                duration = st.text_input(f"Duration #{i+1} (e.g., 2020-2022)", key=f"duration_{i}")
-            responsibilities = st.text_area(f"Key Responsibilities #{i+1}", key=f"resp_{i}")
-            
-            if not all([company, position, duration, responsibilities]):
-                all_fields_filled = False
-            
-            exp = {
-                "company": company,
-                "position": position,
-                "duration": duration,
-                "responsibilities": responsibilities
-            }
-            experiences.append(exp)
+        experiences = self.get_experiences()
+        for i, exp in enumerate(experiences):
+            self.notify_section(('experience', i), 'experience', (exp,) if all(exp.values()) else None)
+        # Drop the prefetches of entries removed by lowering the count
+        for i in range(len(experiences), self.MAX_EXPERIENCES):
+            self.notify_section(('experience', i), 'experience', None)
         
         is_valid = True
         if num_experiences > 0:
-            if all_fields_filled and experiences:
+            if all(all(exp.values()) for exp in experiences):
                 st.success("✓ Experience details complete")
             else:
                 is_valid = False
                 
-        self.experiences = experiences
         self.render_next_button(2, is_valid)
 
     def render_education(self):
@@ -178,43 +214,31 @@ class ResumeForm:
         num_education = st.number_input(
             "Number of educational qualifications",
             min_value=0,
-            max_value=5,
-            value=0,
+            max_value=self.MAX_EDUCATION,
             key="num_edu"
         )
         
-        education = []
-        all_fields_filled = True
-        
-        for i in range(num_education):
-            st.subheader(f"Education {i+1}")
-            col1, col2 = st.columns(2)
-            with col1:
-                institution = st.text_input(f"Institution Name #{i+1}", key=f"inst_{i}")
-                degree = st.text_input(f"Degree #{i+1}", key=f"degree_{i}")
-            with col2:
-                year = st.text_input(f"Year #{i+1}", key=f"year_{i}")
-                grade = st.text_input(f"Grade/CGPA #{i+1} (optional)", key=f"grade_{i}")
-            
-            if not all([institution, degree, year]):
-                all_fields_filled = False
-            
-            edu = {
-                "institution": institution,
-                "degree": degree,
-                "year": year,
-                "grade": grade
-            }
-            education.append(edu)
+        if num_education > 0:
+            # Entries are batched in a form so typing doesn't rerun anything until Save
+            with st.form("education_form", border=False):
+                for i in range(num_education):
+                    st.subheader(f"Education {i+1}")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.text_input(f"Institution Name #{i+1}", key=f"inst_{i}")
+                        st.text_input(f"Degree #{i+1}", key=f"degree_{i}")
+                    with col2:
+                        st.text_input(f"Year #{i+1}", key=f"year_{i}")
+                        st.text_input(f"Grade/CGPA #{i+1} (optional)", key=f"grade_{i}")
+                st.form_submit_button("Save")
         
         is_valid = True
         if num_education > 0:
-            if all_fields_filled and education:
+            if all(edu['institution'] and edu['degree'] and edu['year'] for edu in self.get_education()):
                 st.success("✓ Education details complete")
             else:
                 is_valid = False
                 
-        self.education = education
         self.render_next_button(3, is_valid)
 
     def render_skills(self):
@@ -227,10 +251,10 @@ class ResumeForm:
         
         is_valid = False
         if skills and len(skills.strip()) > 0:
-            self.skills = skills
             st.success("✓ Skills complete")
             is_valid = True
         
+        self.notify_summary_and_skills()
         self.render_next_button(4, is_valid)
 
     def handle_phone_change(self):
@@ -241,11 +265,59 @@ class ResumeForm:
         if phone_input and self.validate_indian_phone(phone_input):
             st.session_state.active_tab = 1
 
+    def get_personal_info(self):
+        """Return the saved personal info, or {} until every required field is valid"""
+        state = st.session_state
+        phone = ''.join(filter(str.isdigit, state.get('phone_input_field') or ''))
+        required = [state.get(key) for key in ('name_input', 'email_input', 'location_input')]
+        if not all(required) or not self.validate_indian_phone(phone):
+            return {}
+        name, email, location = required
+        return {
+            "name": name,
+            "email": email,
+            "location": location,
+            "phone": phone,
+            "linkedin": state.get('linkedin_input') or "",
+            "github": state.get('github_input') or "",
+            "website": state.get('website_input') or ""
+        }
+
+    def get_experiences(self):
+        state = st.session_state
+        return [
+            {
+                "company": state.get(f"company_{i}", ""),
+                "position": state.get(f"position_{i}", ""),
+                "duration": state.get(f"duration_{i}", ""),
+                "responsibilities": state.get(f"resp_{i}", "")
+            }
+            for i in range(state.get('num_exp', 0))
+        ]
+
+    def get_education(self):
+        state = st.session_state
+        return [
+            {
+                "institution": state.get(f"inst_{i}", ""),
+                "degree": state.get(f"degree_{i}", ""),
+                "year": state.get(f"year_{i}", ""),
+                "grade": state.get(f"grade_{i}", "")
+            }
+            for i in range(state.get('num_edu', 0))
+        ]
+
+    def get_skills(self):
+        skills = st.session_state.get('skills_input', '')
+        return skills.split('\n') if skills else []
+
     def get_form_data(self):
+        # Read everything from session state: each tab renders in its own
+        # fragment, so no single run sees all of the widgets
         return {
-            "personal_info": self.personal_info,
+            "personal_info": self.get_personal_info(),
             "summary": st.session_state.get('professional_summary', ''),  # Get from session state
-            "experience": self.experiences,
-            "education": self.education,
-            "skills": self.skills.split('\n') if self.skills else []
+            "experience": self.get_experiences(),
+            "education": self.get_education(),
+            "skills": self.get_skills()
         }
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from utils.job_queue import JobQueue
+
+
+def finished(username, user_info, report):
+    return {'name': username}, b'%PDF', 0
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def claim(job_queue, job_id, heartbeat_at):
+    """Mark job_id as running under job_queue with the given last heartbeat"""
+    with job_queue.pool.connection() as conn:
+        conn.execute(
+            "UPDATE generation_jobs SET status = 'running', owner = ?, heartbeat_at = ? WHERE id = ?",
+            (job_queue.owner, heartbeat_at, job_id)
+        )
+
+
+def test_only_jobs_with_a_stale_heartbeat_are_requeued(db_path):
+    job_queue = JobQueue(db_path, workers=0, handler=finished, heartbeat_timeout=60)
+    other = JobQueue(db_path, workers=0, handler=finished)
+    alive = job_queue.submit('alice', {'name': 'Alice'})
+    gone = job_queue.submit('bob', {'name': 'Bob'})
+    claim(other, alive, time.time() - 30)
+    claim(other, gone, time.time() - 90)
+
+    assert job_queue.requeue_stale() == [gone]
+    assert job_queue.get(alive)['status'] == 'running'
+    assert job_queue.get(gone)['status'] == 'queued'
+
+
+def test_claimed_job_records_its_owner(db_path):
+    job_queue = JobQueue(db_path, workers=0, handler=finished)
+    job_id = job_queue.submit('alice', {'name': 'Alice'})
+
+    job_queue._run(job_id)
+
+    with job_queue.pool.connection() as conn:
+        owner, heartbeat_at = conn.execute(
+            'SELECT owner, heartbeat_at FROM generation_jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+    assert owner == job_queue.owner
+    assert heartbeat_at is not None
+    assert job_queue.get(job_id)['status'] == 'done'
+
+
+def test_requeued_job_ignores_its_previous_worker(db_path):
+    rescuer = JobQueue(db_path, workers=0, handler=finished, heartbeat_timeout=-1)
+
+    def stalled(username, user_info, report):
+        # Another process decides this one is gone while the job is still running here
+        rescuer.requeue_stale()
+        report(0.5, 'Still going', {})
+        return finished(username, user_info, report)
+
+    job_queue = JobQueue(db_path, workers=0, handler=stalled)
+    job_id = job_queue.submit('alice', {'name': 'Alice'})
+
+    job_queue._run(job_id)
+    assert job_queue.get(job_id)['status'] == 'queued'
+    assert job_queue.get(job_id)['progress'] == 0
+
+    rescuer._run(job_id)
+    assert rescuer.get(job_id)['status'] == 'done'
@@ -0,0 +1,104 @@
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimitError, RetryPolicy, TokenBucket
+
+
+class TransientBackendError(Exception):
+    """Named like the fake backend's retryable error"""
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_bucket_starts_full(clock):
+    bucket = TokenBucket(rate_per_second=1.0, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert clock.sleeps == []
+
+
+def test_bucket_waits_for_refill_when_empty(clock):
+    bucket = TokenBucket(rate_per_second=2.0, capacity=1)
+    bucket.acquire()
+
+    waited = bucket.acquire()
+
+    assert waited == pytest.approx(0.5)
+    assert bucket.get_stats()['acquired'] == 2
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.advance(60)
+
+    assert [bucket.acquire() for _ in range(2)] == [0, 0]
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_bucket_gives_up_at_deadline(clock):
+    bucket = TokenBucket(rate_per_second=0.1, capacity=1)
+    bucket.acquire()
+
+    with pytest.raises(RateLimitError):
+        bucket.acquire(deadline=clock.monotonic() + 1)
+    assert bucket.get_stats()['timeouts'] == 1
+    assert bucket.get_stats()['waiting'] == 0
+
+
+def flaky(failures, error=TransientBackendError):
+    """Return a function that raises error failures times, then returns 'ok'"""
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("try again")
+        return 'ok'
+
+    func.calls = calls
+    return func
+
+
+def test_retry_policy_retries_transient_errors(clock):
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0)
+    func = flaky(2)
+
+    assert policy.call(func) == 'ok'
+    assert len(func.calls) == 3
+    assert policy.get_stats()['retries'] == 2
+
+
+def test_retry_policy_raises_other_errors_at_once(clock):
+    policy = RetryPolicy(max_attempts=3)
+    func = flaky(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        policy.call(func)
+    assert len(func.calls) == 1
+    assert policy.get_stats()['failures'] == 1
+
+
+def test_retry_policy_gives_up_after_max_attempts(clock):
+    policy = RetryPolicy(max_attempts=2, base_delay=0.1)
+    func = flaky(5)
+
+    with pytest.raises(RateLimitError):
+        policy.call(func)
+    assert len(func.calls) == 2
+    assert policy.get_stats()['gave_up'] == 1
+
+
+def test_retry_policy_takes_a_token_per_attempt(clock):
+    bucket = TokenBucket(rate_per_second=1.0, capacity=5)
+    policy = RetryPolicy(limiter=bucket, max_attempts=3, base_delay=0)
+
+    policy.call(flaky(2))
+
+    assert bucket.get_stats()['acquired'] == 3
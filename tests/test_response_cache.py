@@ -0,0 +1,71 @@
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache, make_cache_key
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(response_cache, 'time', clock)
+    return clock
+
+
+def test_cache_key_ignores_dict_order():
+    assert make_cache_key('summary', {'a': 1, 'b': 2}) == make_cache_key('summary', {'b': 2, 'a': 1})
+    assert make_cache_key('summary', {'a': 1}) != make_cache_key('skills', {'a': 1})
+
+
+def test_memory_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl_seconds=60)
+    cache.set('key', 'value')
+
+    clock.advance(59)
+    assert cache.get('key') == 'value'
+    clock.advance(1)
+    assert cache.get('key') is None
+    assert cache.get_stats()['expired'] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    cache.get('a')
+    cache.set('c', '3')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_disk_tier_outlives_the_process_cache(clock, tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    ResponseCache(db_path=db_path).set('key', 'value')
+
+    cache = ResponseCache(db_path=db_path)
+    assert cache.get('key') == 'value'
+    assert cache.get_stats()['disk_hits'] == 1
+
+
+def test_disk_entries_expire_after_ttl(clock, tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    ResponseCache(ttl_seconds=60, db_path=db_path).set('key', 'value')
+    clock.advance(61)
+
+    cache = ResponseCache(ttl_seconds=60, db_path=db_path)
+    assert cache.get('key') is None
+    assert cache.get_stats()['expired'] == 1
+
+
+def test_purge_expired_drops_both_tiers(clock, tmp_path):
+    cache = ResponseCache(ttl_seconds=60, db_path=str(tmp_path / 'cache.db'))
+    cache.set('old', 'value')
+    clock.advance(30)
+    cache.set('new', 'value')
+    clock.advance(31)
+
+    cache.purge_expired()
+
+    assert cache.get_stats()['expired'] == 2
+    assert cache.get('new') == 'value'
+    assert cache.get('old') is None
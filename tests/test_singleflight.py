@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.ai_generator import AIGenerator
+from utils.llm_backends import FakeBackend
+from utils.rate_limiter import RetryPolicy
+from utils.response_cache import ResponseCache
+from utils.singleflight import Abandoned, SingleFlight
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def start_followers(flight, key, count, func):
+    """Start count callers of flight.do(key, func) once a leader holds key; return their futures"""
+    executor = ThreadPoolExecutor(max_workers=count)
+    coalesced = flight.get_stats()['coalesced']
+    futures = [executor.submit(flight.do, key, func) for _ in range(count)]
+    wait_for(lambda: flight.get_stats()['coalesced'] == coalesced + count)
+    executor.shutdown(wait=False)
+    return futures
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def leader():
+        calls.append(1)
+        release.wait(5)
+        return 'result'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        lead = executor.submit(flight.do, 'key', leader)
+        wait_for(lambda: calls)
+        followers = start_followers(flight, 'key', 4, lambda: calls.append(1))
+        release.set()
+        results = [lead.result(5)] + [future.result(5) for future in followers]
+
+    assert results == ['result'] * 5
+    assert len(calls) == 1
+    assert flight.get_stats() == {'calls': 1, 'coalesced': 4, 'errors': 0, 'abandoned': 0, 'in_flight': 0}
+
+
+def test_leader_failure_propagates_to_followers():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("model failed")
+
+    def leader():
+        release.wait(5)
+        raise error
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        lead = executor.submit(flight.do, 'key', leader)
+        wait_for(lambda: flight.get_stats()['in_flight'] == 1)
+        followers = start_followers(flight, 'key', 3, lambda: 'unused')
+        release.set()
+        for future in [lead] + followers:
+            assert future.exception(5) is error
+
+    assert flight.get_stats()['errors'] == 1
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_completed_calls_are_not_remembered():
+    flight = SingleFlight()
+    calls = []
+
+    assert flight.do('key', lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do('key', lambda: calls.append(1) or len(calls)) == 2
+    assert flight.get_stats()['calls'] == 2
+
+
+def test_abandoned_leader_hands_the_call_to_a_follower():
+    flight = SingleFlight()
+    future, leader = flight.begin('key')
+    assert leader
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        follower = executor.submit(flight.do, 'key', lambda: 'retried')
+        wait_for(lambda: flight.get_stats()['coalesced'] == 1)
+        flight.finish('key', future, error=GeneratorExit())
+        assert follower.result(5) == 'retried'
+
+    assert isinstance(future.exception(), Abandoned)
+    assert flight.get_stats()['abandoned'] == 1
+    assert flight.get_stats()['calls'] == 2
+
+
+@pytest.fixture
+def generator():
+    return AIGenerator(
+        cache=ResponseCache(max_entries=16),
+        backend=FakeBackend(latency=0, error_rate=0),
+        retry_policy=RetryPolicy(max_attempts=1),
+        single_flight=SingleFlight()
+    )
+
+
+def test_closed_leader_stream_marks_followers_abandoned(generator):
+    stream = generator._stream_complete('summary', {'summary': 'x'}, 'Write a summary')
+    next(stream)
+    key = generator._cache_key('summary', {'summary': 'x'})
+    follower, leader = generator.single_flight.begin(key)
+    assert not leader
+
+    stream.close()
+
+    assert isinstance(follower.exception(5), Abandoned)
+    assert generator.single_flight.get_stats()['in_flight'] == 0
+
+
+def test_stream_joining_a_call_in_flight_yields_its_text(generator):
+    key = generator._cache_key('summary', {'summary': 'y'})
+    future, leader = generator.single_flight.begin(key)
+    assert leader
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stream = executor.submit(
+            lambda: list(generator._stream_complete('summary', {'summary': 'y'}, 'Write a summary'))
+        )
+        wait_for(lambda: generator.single_flight.get_stats()['coalesced'] == 1)
+        generator.single_flight.finish(key, future, result='shared text')
+        assert stream.result(5) == ['shared text']
+
+
+def test_late_leader_is_served_from_the_cache(generator):
+    # A caller that missed the cache just before the previous leader stored its text
+    key = generator._cache_key('summary', {'summary': 'z'})
+    generator.cache.set(key, 'stored text')
+    generator._lookup = lambda key, known_sections=None: None
+    generator.backend.generate = generator.backend.stream = None
+
+    assert generator._complete('summary', {'summary': 'z'}, 'Write a summary') == 'stored text'
+    assert list(generator._stream_complete('summary', {'summary': 'z'}, 'Write a summary')) == ['stored text']
+    assert generator.cache.get_stats()['misses'] == 0
@@ -1,14 +1,243 @@
-import google.generativeai as genai
 import json
-from config.settings import GOOGLE_API_KEY, RESUME_SECTIONS
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    RESUME_SECTIONS, LLM_BACKEND, AI_MAX_CONCURRENCY,
+    AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS, AI_CACHE_DB_PATH, AI_GENERATION_STRATEGY,
+    AI_RATE_LIMIT_PER_MINUTE, AI_RATE_LIMIT_BURST, AI_MAX_ATTEMPTS,
+    AI_RETRY_BASE_DELAY, AI_RETRY_MAX_DELAY, AI_RETRY_DEADLINE
+)
+from utils import metrics
+from utils.llm_backends import create_backend
+from utils.rate_limiter import RetryPolicy, TokenBucket
+from utils.response_cache import ResponseCache, make_cache_key
+from utils.singleflight import Abandoned, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a prompt template changes so stale cached responses are not reused
+PROMPT_VERSION = 1
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+_retry_policy = None
+_retry_policy_lock = threading.Lock()
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+_ai_generator = None
+_ai_generator_lock = threading.Lock()
+
+
+def get_backend(name=LLM_BACKEND):
+    """Return the process-wide LLM backend client, creating it on first use"""
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = create_backend(name)
+                _backends[name] = backend
+    return backend
+
+
+def get_ai_generator():
+    """Return the AIGenerator shared by every session in this process"""
+    global _ai_generator
+    if _ai_generator is None:
+        with _ai_generator_lock:
+            if _ai_generator is None:
+                _ai_generator = AIGenerator()
+    return _ai_generator
+
+
+def get_retry_policy():
+    """Return the process-wide rate limiter and retry policy for model calls"""
+    global _retry_policy
+    if _retry_policy is None:
+        with _retry_policy_lock:
+            if _retry_policy is None:
+                _retry_policy = RetryPolicy(
+                    limiter=TokenBucket(AI_RATE_LIMIT_PER_MINUTE / 60.0, AI_RATE_LIMIT_BURST),
+                    max_attempts=AI_MAX_ATTEMPTS,
+                    base_delay=AI_RETRY_BASE_DELAY,
+                    max_delay=AI_RETRY_MAX_DELAY,
+                    deadline=AI_RETRY_DEADLINE
+                )
+    return _retry_policy
+
+
+def get_response_cache():
+    """Return the process-wide AI response cache, creating it on first use"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_entries=AI_CACHE_MAX_ENTRIES,
+                    ttl_seconds=AI_CACHE_TTL_SECONDS,
+                    db_path=AI_CACHE_DB_PATH
+                )
+    return _response_cache
+
+
+def get_single_flight():
+    """Return the process-wide table of in-flight model calls, shared by identical requests"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
+
+
+def _collect_ai_stats():
+    """Expose the response cache, rate limiter and single-flight counters to the metrics registry"""
+    collected = []
+    if _response_cache is not None:
+        stats = _response_cache.get_stats()
+        for name in ('memory_hits', 'disk_hits', 'misses', 'evictions', 'expired'):
+            collected.append((f'ai_response_cache_{name}_total', 'counter', {}, stats[name]))
+        collected.append(('ai_response_cache_entries', 'gauge', {}, stats['entries']))
+    if _retry_policy is not None:
+        stats = _retry_policy.get_stats()
+        for name in ('calls', 'retries', 'failures', 'gave_up', 'acquired', 'timeouts'):
+            collected.append((f'ai_rate_limiter_{name}_total', 'counter', {}, stats[name]))
+        collected.append(('ai_rate_limiter_waiting', 'gauge', {}, stats['waiting']))
+        collected.append(('ai_rate_limiter_queue_wait_seconds_total', 'counter', {}, stats['queue_wait_seconds']))
+    if _single_flight is not None:
+        stats = _single_flight.get_stats()
+        for name in ('calls', 'coalesced', 'errors', 'abandoned'):
+            collected.append((f'ai_single_flight_{name}_total', 'counter', {}, stats[name]))
+        collected.append(('ai_single_flight_in_flight', 'gauge', {}, stats['in_flight']))
+    return collected
+
+
+metrics.register_collector(_collect_ai_stats)
+
 
 class AIGenerator:
-    def __init__(self):
-        genai.configure(api_key=GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, max_concurrency=AI_MAX_CONCURRENCY, cache=None, strategy=AI_GENERATION_STRATEGY,
+                 retry_policy=None, backend=None, single_flight=None):
+        self._backend = backend
+        self.max_concurrency = max_concurrency
+        self.strategy = strategy
+        self.cache = cache if cache is not None else get_response_cache()
+        self.retry_policy = retry_policy if retry_policy is not None else get_retry_policy()
+        self.single_flight = single_flight if single_flight is not None else get_single_flight()
 
-    def enhance_experience(self, experience):
-        """Enhance a single work experience entry with AI-generated improvements"""
+    @property
+    def backend(self):
+        """The LLM backend, resolved to the shared client the first time a generation runs"""
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    def _normalize_experience(self, experience):
+        return {
+            field: str(experience.get(field, '')).strip()
+            for field in ('company', 'position', 'duration', 'responsibilities')
+        }
+
+    def _normalize_skills(self, skills):
+        return [skill.strip() for skill in skills if skill and skill.strip()]
+
+    def _cache_key(self, section, inputs):
+        """Content-addressed key for a section's normalized inputs"""
+        return make_cache_key(self.backend.model_name, PROMPT_VERSION, section, inputs)
+
+    def _prompt_key(self, prompt):
+        """Single-flight key for a raw prompt, ignoring differences in whitespace"""
+        return make_cache_key(self.backend.model_name, 'prompt', ' '.join(prompt.split()))
+
+    def _call_model(self, prompt):
+        """Send prompt to the backend through the shared rate limiter and retry policy"""
+        with metrics.timer('ai_call_seconds', backend=self.backend.model_name, mode='generate'):
+            return self.retry_policy.call(self.backend.generate, prompt)
+
+    def _stream_model(self, prompt):
+        """Start a streamed response through the shared rate limiter and retry policy"""
+        with metrics.timer('ai_call_seconds', backend=self.backend.model_name, mode='stream_start'):
+            return self.retry_policy.call(self.backend.stream, prompt)
+
+    def _lookup(self, key, known_sections=None):
+        """Return a previously generated text for key from known_sections or the cache"""
+        if known_sections and key in known_sections:
+            return known_sections[key]
+        return self.cache.get(key)
+
+    def _complete(self, section, inputs, prompt, known_sections=None):
+        """Return the model's response for prompt, served from known sections or the cache when possible"""
+        key = self._cache_key(section, inputs)
+        cached = self._lookup(key, known_sections)
+        if cached is not None:
+            return cached
+
+        # Identical requests already in flight (another session, a prefetch) share that call
+        return self.single_flight.do(key, self._fetch, key, prompt)
+
+    def _fetch(self, key, prompt):
+        # A call that finished between our cache lookup and becoming leader has already stored its text
+        cached = self.cache.get(key, count_miss=False)
+        if cached is not None:
+            return cached
+        text = self._call_model(prompt).strip()
+        self.cache.set(key, text)
+        return text
+
+    def _stream_complete(self, section, inputs, prompt, known_sections=None):
+        """Yield the model's response for prompt chunk by chunk, caching the full text
+
+        If an identical request is already in flight, streamed or not, its
+        full text is yielded as one chunk once it completes.
+        """
+        key = self._cache_key(section, inputs)
+        cached = self._lookup(key, known_sections)
+        if cached is not None:
+            yield cached
+            return
+
+        while True:
+            future, leader = self.single_flight.begin(key)
+            if leader:
+                break
+            try:
+                yield future.result()
+                return
+            except Abandoned:
+                continue
+
+        cached = self.cache.get(key, count_miss=False)
+        if cached is not None:
+            # Stored by a call that finished between our lookup and becoming leader
+            self.single_flight.finish(key, future, result=cached)
+            yield cached
+            return
+
+        try:
+            start = time.perf_counter()
+            parts = []
+            for chunk in self._stream_model(prompt):
+                parts.append(chunk)
+                yield chunk
+            metrics.observe('ai_stream_seconds', time.perf_counter() - start, backend=self.backend.model_name)
+            text = ''.join(parts).strip()
+            self.cache.set(key, text)
+        except BaseException as e:
+            self.single_flight.finish(key, future, error=e)
+            raise
+        self.single_flight.finish(key, future, result=text)
+
+    def _experience_request(self, experience):
+        """Return the (section, inputs, prompt) request for a work experience"""
         prompt = f"""
         Given this work experience:
         Company: {experience['company']}
@@ -26,12 +255,10 @@ class AIGenerator:
 
         Format the response as bullet points starting with '*'.
         """
-        
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
-        
-    def enhance_summary(self, summary, skills):
-        """Generate an enhanced professional summary"""
+        return 'experience', self._normalize_experience(experience), prompt
+
+    def _summary_request(self, summary, skills):
+        """Return the (section, inputs, prompt) request for the professional summary"""
         prompt = f"""
         Based on this professional summary:
         {summary}
@@ -49,12 +276,11 @@ class AIGenerator:
 
         Make it compelling and ATS-friendly.
         """
-        
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
-        
-    def enhance_skills(self, skills):
-        """Organize and enhance the skills section"""
+        inputs = {'summary': summary.strip(), 'skills': self._normalize_skills(skills)}
+        return 'summary', inputs, prompt
+
+    def _skills_request(self, skills):
+        """Return the (section, inputs, prompt) request for the skills section"""
         skills_str = ', '.join(skills)
         prompt = f"""
         Given these skills:
@@ -70,9 +296,24 @@ class AIGenerator:
         Format each category as:
         CATEGORY NAME: skill1 | skill2 | skill3
         """
+        return 'skills', self._normalize_skills(skills), prompt
+
+    def section_key(self, section, *args):
+        """Return the cache key enhance_<section>(*args) reads and writes"""
+        section, inputs, _ = getattr(self, f'_{section}_request')(*args)
+        return self._cache_key(section, inputs)
+
+    def enhance_experience(self, experience):
+        """Enhance a single work experience entry with AI-generated improvements"""
+        return self._complete(*self._experience_request(experience))
         
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
+    def enhance_summary(self, summary, skills):
+        """Generate an enhanced professional summary"""
+        return self._complete(*self._summary_request(summary, skills))
+        
+    def enhance_skills(self, skills):
+        """Organize and enhance the skills section"""
+        return self._complete(*self._skills_request(skills))
         
     def enhance_education(self, education):
         """Enhance education entries with additional details"""
@@ -91,21 +332,258 @@ class AIGenerator:
             enhanced_entries.append(enhanced_entry)
         return enhanced_entries
 
-    def generate_content(self, user_info):
-        """Generate the complete resume content"""
-        # First, enhance individual sections
+    def _run_tasks(self, tasks):
+        """Run (function, args) tasks, concurrently when allowed, keeping their order"""
+        workers = min(self.max_concurrency, len(tasks))
+        if workers <= 1:
+            return [func(*args) for func, args in tasks]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(func, *args) for func, args in tasks]
+            return [future.result() for future in futures]
+
+    def _section_requests(self, user_info):
+        """Return the (section, inputs, prompt) requests for every AI-enhanced section
+
+        The order is the experiences, then the summary, then the skills.
+        """
+        with metrics.timer('ai_prompt_build_seconds'):
+            requests = [self._experience_request(exp) for exp in user_info['experience']]
+            requests.append(self._summary_request(user_info['summary'], user_info['skills']))
+            requests.append(self._skills_request(user_info['skills']))
+        return requests
+
+    def section_contents(self, user_info, resume_content):
+        """Map each section's input hash to its (section, generated text) in resume_content
+
+        Passing these hashes and texts back as known_sections lets a later
+        generation skip sections whose inputs have not changed.
+        """
+        texts = [exp['achievements'] for exp in resume_content['experience']]
+        texts += [resume_content['professional_summary'], resume_content['skills']]
+        return {
+            self._cache_key(section, inputs): (section, text)
+            for (section, inputs, _), text in zip(self._section_requests(user_info), texts)
+        }
+
+    def _enhance_per_section(self, user_info, known_sections=None):
+        """Enhance each section with its own prompt, returning (bullets, summary, skills)"""
+        # The prompts are independent, so they are sent together
+        # (up to max_concurrency at a time).
+        tasks = [
+            (self._complete, request + (known_sections,))
+            for request in self._section_requests(user_info)
+        ]
+        results = self._run_tasks(tasks)
+        return results[:-2], results[-2], results[-1]
+
+    def _build_batch_prompt(self, pending):
+        """Build a single prompt asking for every pending section as one JSON document"""
+        return f"""
+        You are enhancing several sections of a resume at once.
+
+        INPUT:
+        {json.dumps(pending, indent=2)}
+
+        For every entry in "experience", write 4-5 strong, quantifiable bullet points that
+        start with powerful action verbs, include metrics where appropriate, highlight
+        leadership and focus on results and impact. Format them as bullet points starting
+        with '*', separated by newlines.
+
+        If "summary" is present, write a powerful, keyword-rich, ATS-friendly professional
+        summary of 3-4 lines that naturally incorporates the most relevant skills.
+
+        If "skills" is present, group the skills into relevant categories, add implied or
+        related skills and order them by relevance, formatting each category as
+        CATEGORY NAME: skill1 | skill2 | skill3
+
+        Respond with JSON only, no markdown, using exactly this schema and including only
+        the keys present in INPUT:
+        {{
+            "experience": [{{"index": <input index>, "achievements": "<bullet points>"}}],
+            "professional_summary": "<summary>",
+            "skills": "<categorised skills>"
+        }}
+        """
+
+    def _parse_batch_response(self, text):
+        """Parse the batched JSON response, tolerating markdown code fences"""
+        text = text.strip()
+        if text.startswith('```'):
+            text = text.split('\n', 1)[1] if '\n' in text else ''
+            text = text.rsplit('```', 1)[0]
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end == -1:
+            raise ValueError("Response does not contain a JSON object")
+        data = json.loads(text[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("Response is not a JSON object")
+        return data
+
+    def _valid_text(self, value):
+        return value.strip() if isinstance(value, str) and value.strip() else None
+
+    def _enhance_batched(self, user_info, known_sections=None):
+        """Enhance every section with one prompt, returning (bullets, summary, skills)
+
+        Sections already known or in the cache are not re-sent, and any section that is
+        missing or malformed in the JSON response falls back to its own prompt.
+        """
+        experiences = user_info['experience']
+        summary, skills = user_info['summary'], user_info['skills']
+        _, summary_inputs, _ = self._summary_request(summary, skills)
+        _, skills_inputs, _ = self._skills_request(skills)
+
+        keys = {('experience', i): self._cache_key('experience', self._normalize_experience(exp))
+                for i, exp in enumerate(experiences)}
+        keys['summary'] = self._cache_key('summary', summary_inputs)
+        keys['skills'] = self._cache_key('skills', skills_inputs)
+        results = {section: self._lookup(key, known_sections) for section, key in keys.items()}
+
+        pending = {}
+        pending_experience = [
+            dict(self._normalize_experience(exp), index=i)
+            for i, exp in enumerate(experiences) if results[('experience', i)] is None
+        ]
+        if pending_experience:
+            pending['experience'] = pending_experience
+        if results['summary'] is None:
+            pending['summary'] = summary_inputs
+        if results['skills'] is None:
+            pending['skills'] = skills_inputs
+
+        if pending:
+            prompt = self._build_batch_prompt(pending)
+            response = self.single_flight.do(self._prompt_key(prompt), self._call_model, prompt)
+            try:
+                data = self._parse_batch_response(response)
+            except ValueError as e:
+                logger.warning("Batched response could not be parsed, falling back per section: %s", e)
+                metrics.inc('ai_batch_parse_failures_total')
+                data = {}
+
+            parsed = {}
+            entries = data.get('experience')
+            for entry in entries if isinstance(entries, list) else []:
+                if isinstance(entry, dict) and isinstance(entry.get('index'), int):
+                    parsed[('experience', entry['index'])] = self._valid_text(entry.get('achievements'))
+            parsed['summary'] = self._valid_text(data.get('professional_summary'))
+            parsed['skills'] = self._valid_text(data.get('skills'))
+
+            for section in results:
+                if results[section] is None and parsed.get(section):
+                    results[section] = parsed[section]
+                    self.cache.set(keys[section], parsed[section])
+
+        # Fall back to individual prompts for anything the batch didn't deliver
+        fallback = [(i, exp) for i, exp in enumerate(experiences) if results[('experience', i)] is None]
+        tasks = [(self.enhance_experience, (exp,)) for _, exp in fallback]
+        if results['summary'] is None:
+            tasks.append((self.enhance_summary, (summary, skills)))
+        if results['skills'] is None:
+            tasks.append((self.enhance_skills, (skills,)))
+        fallback_results = self._run_tasks(tasks) if tasks else []
+
+        for (i, _), text in zip(fallback, fallback_results):
+            results[('experience', i)] = text
+        remaining = fallback_results[len(fallback):]
+        if results['summary'] is None:
+            results['summary'] = remaining.pop(0)
+        if results['skills'] is None:
+            results['skills'] = remaining.pop(0)
+
+        bullets = [results[('experience', i)] for i in range(len(experiences))]
+        return bullets, results['summary'], results['skills']
+
+    def generate_content(self, user_info, strategy=None, known_sections=None):
+        """Generate the complete resume content
+
+        strategy is 'concurrent' (one prompt per section) or 'batched' (a single
+        JSON prompt for the whole resume); it defaults to AI_GENERATION_STRATEGY.
+        known_sections maps input hashes (see section_contents) to texts from an
+        earlier generation; those sections are reused instead of regenerated.
+        """
+        strategy = strategy or self.strategy
+        with metrics.timer('ai_generate_content_seconds', strategy=strategy):
+            if strategy == 'batched':
+                sections = self._enhance_batched(user_info, known_sections)
+            else:
+                sections = self._enhance_per_section(user_info, known_sections)
+        bullets, enhanced_summary, enhanced_skills = sections
+
+        return self._build_resume_content(user_info, bullets, enhanced_summary, enhanced_skills)
+
+    def generate_content_stream(self, user_info, known_sections=None):
+        """Generate the resume content, yielding progress events as text arrives
+
+        Yields dicts with a 'type' of:
+        - 'chunk': a piece of text for a section ('section', 'index', 'text')
+        - 'section_done': a finished section ('section', 'index', 'text', 'completed', 'total')
+        - 'complete': the final resume_content ('content')
+
+        Sections are streamed concurrently (up to max_concurrency at a time) using
+        one prompt each, regardless of the configured strategy. Sections found in
+        known_sections are emitted straight away without calling the model.
+        """
+        experiences = user_info['experience']
+        requests = self._section_requests(user_info)
+        slots = [('experience', i) for i in range(len(experiences))]
+        slots += [('summary', None), ('skills', None)]
+
+        events = queue.Queue()
+
+        def pump(position):
+            try:
+                for chunk in self._stream_complete(*requests[position], known_sections):
+                    events.put((position, chunk, None))
+                events.put((position, None, None))
+            except Exception as e:
+                events.put((position, None, e))
+
+        parts = [[] for _ in requests]
+        texts = [None] * len(requests)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(requests))))
+        try:
+            for position in range(len(requests)):
+                executor.submit(pump, position)
+
+            completed = 0
+            while completed < len(requests):
+                position, chunk, error = events.get()
+                if error is not None:
+                    raise error
+                section, index = slots[position]
+                if chunk is None:
+                    completed += 1
+                    texts[position] = ''.join(parts[position]).strip()
+                    yield {
+                        'type': 'section_done',
+                        'section': section,
+                        'index': index,
+                        'text': texts[position],
+                        'completed': completed,
+                        'total': len(requests)
+                    }
+                else:
+                    parts[position].append(chunk)
+                    yield {'type': 'chunk', 'section': section, 'index': index, 'text': chunk}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        content = self._build_resume_content(user_info, texts[:-2], texts[-2], texts[-1])
+        yield {'type': 'complete', 'content': content}
+
+    def _build_resume_content(self, user_info, bullets, enhanced_summary, enhanced_skills):
+        """Assemble resume_content from the enhanced section texts"""
         enhanced_experiences = []
-        for exp in user_info['experience']:
-            enhanced_bullet_points = self.enhance_experience(exp)
+        for exp, enhanced_bullet_points in zip(user_info['experience'], bullets):
             enhanced_experiences.append({
                 'company': exp['company'],
                 'position': exp['position'],
                 'duration': exp['duration'],
                 'achievements': enhanced_bullet_points
             })
-            
-        enhanced_summary = self.enhance_summary(user_info['summary'], user_info['skills'])
-        enhanced_skills = self.enhance_skills(user_info['skills'])
+
         enhanced_education = self.enhance_education(user_info.get('education', []))
         
         # Create structured resume content with all personal info
@@ -0,0 +1,205 @@
+"""Render many resume_content JSON documents to PDF using every CPU core.
+
+Usage:
+    python -m utils.batch_render resumes/ --out-dir out/
+    python -m utils.batch_render resumes.jsonl --out-dir out/ --theme classic
+    python -m utils.batch_render resumes/ --out-dir out/ --template compact
+    cat resumes.jsonl | python -m utils.batch_render - --out-dir out/
+
+Inputs can be directories of *.json files, .jsonl files or '-' for JSONL on
+stdin. Each JSONL record may carry an 'id' used as the output file name; it
+must be a plain file name and unique within the batch. Unreadable records,
+invalid ids and repeated ids are reported as failed documents and the rest
+of the batch still renders.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from config.settings import PDF_TEMPLATE
+from utils.pdf_generator import PDFGenerator
+
+
+def iter_documents(sources):
+    """Yield (doc_id, resume_content) pairs from directories, JSONL files or stdin
+
+    A file or JSONL record that cannot be parsed is yielded with the ValueError
+    describing it in place of its content.
+    """
+    for source in sources:
+        if source == '-':
+            yield from _iter_jsonl(sys.stdin, 'stdin')
+            continue
+
+        path = Path(source)
+        if path.is_dir():
+            for json_file in sorted(path.glob('*.json')):
+                yield json_file.stem, _load_json(json_file)
+        elif path.suffix == '.jsonl':
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from _iter_jsonl(f, path.stem)
+        else:
+            yield path.stem, _load_json(path)
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            return ValueError(f"invalid JSON: {e}")
+
+
+def _iter_jsonl(lines, prefix):
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        doc_id = f"{prefix}-{line_number}"
+        try:
+            document = json.loads(line)
+        except ValueError as e:
+            yield doc_id, ValueError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(document, dict):
+            yield doc_id, ValueError("expected a JSON object")
+            continue
+        yield str(document.pop('id', doc_id)), document
+
+
+def _check_id(doc_id):
+    """Raise ValueError unless doc_id can be used as a file name inside the output directory"""
+    if doc_id in ('', '.', '..') or os.path.basename(doc_id) != doc_id or '\\' in doc_id or '\0' in doc_id:
+        raise ValueError(f"invalid id {doc_id!r}, expected a plain file name")
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_atomic(path, data):
+    """Write bytes to path so readers never observe a partially written file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates the file 0600; give it the mode a plain open() would
+            os.fchmod(f.fileno(), 0o666 & ~_umask())
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_document(doc_id, resume_content, out_path, theme, template=PDF_TEMPLATE):
+    """Render one document in a worker process and return its timing"""
+    start = time.perf_counter()
+    try:
+        # One-shot documents: a worker's PDF cache would only fill up with renders never read again
+        generator = PDFGenerator(theme=theme, template=template, use_cache=False)
+        pdf_bytes = generator.generate_pdf(resume_content)
+        write_atomic(out_path, pdf_bytes)
+        return {
+            'id': doc_id,
+            'path': out_path,
+            'pages': generator.page_count,
+            'bytes': len(pdf_bytes),
+            'seconds': time.perf_counter() - start,
+            'error': None
+        }
+    except Exception as e:
+        return _failed(doc_id, out_path, time.perf_counter() - start, e)
+
+
+def _failed(doc_id, out_path, seconds, error):
+    return {'id': doc_id, 'path': out_path, 'pages': 0, 'bytes': 0, 'seconds': seconds, 'error': str(error)}
+
+
+def render_batch(documents, out_dir, theme='default', workers=None, report=print, template=PDF_TEMPLATE):
+    """Render documents on a process pool, reporting each result as it finishes
+
+    Only a bounded number of documents are in flight at once so arbitrarily
+    long JSONL streams can be processed without loading them all.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    seen_ids = set()
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for doc_id, resume_content in documents:
+            try:
+                _check_id(doc_id)
+                if doc_id in seen_ids:
+                    raise ValueError(f"duplicate id {doc_id!r}, its output would overwrite an earlier document")
+                seen_ids.add(doc_id)
+                if isinstance(resume_content, ValueError):
+                    raise resume_content
+            except ValueError as e:
+                results.append(_report(_failed(doc_id, None, 0.0, e), report))
+                continue
+            out_path = os.path.join(out_dir, f"{doc_id}.pdf")
+            pending.add(executor.submit(render_document, doc_id, resume_content, out_path, theme, template))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results.append(_report(future.result(), report))
+        for future in wait(pending).done:
+            results.append(_report(future.result(), report))
+
+    elapsed = time.perf_counter() - start
+    pages = sum(result['pages'] for result in results)
+    failures = [result for result in results if result['error']]
+    summary = {
+        'documents': len(results),
+        'failures': len(failures),
+        'pages': pages,
+        'workers': workers,
+        'seconds': elapsed,
+        'pages_per_second': pages / elapsed if elapsed else 0.0
+    }
+    report(
+        f"Rendered {summary['documents'] - summary['failures']}/{summary['documents']} documents, "
+        f"{pages} pages in {elapsed:.2f}s on {workers} workers "
+        f"({summary['pages_per_second']:.1f} pages/sec)"
+    )
+    return summary
+
+
+def _report(result, report):
+    if result['error']:
+        report(f"{result['id']}: FAILED after {result['seconds'] * 1000:.1f} ms: {result['error']}")
+    else:
+        report(
+            f"{result['id']}: {result['pages']} pages, {result['bytes']} bytes "
+            f"in {result['seconds'] * 1000:.1f} ms -> {result['path']}"
+        )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch render resume_content JSON documents to PDF")
+    parser.add_argument('inputs', nargs='+', help="directories of *.json, .jsonl files, or '-' for stdin")
+    parser.add_argument('--out-dir', required=True, help="directory the PDFs are written to")
+    parser.add_argument('--theme', default='default', help="PDF theme name")
+    parser.add_argument('--template', default=PDF_TEMPLATE, help="PDF layout template from config/templates")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    summary = render_batch(iter_documents(args.inputs), args.out_dir, theme=args.theme,
+                           workers=args.workers, template=args.template)
+    return 1 if summary['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
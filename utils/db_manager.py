@@ -1,19 +1,22 @@
-import sqlite3
-import bcrypt
+import json
+import logging
 import os
+import sqlite3
+import sys
+import threading
+from utils import metrics
+from utils.password_hasher import HasherBusyError, get_password_hasher
+from utils.sqlite_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+_json_migration_lock = threading.Lock()
 
 class DatabaseManager:
-    def __init__(self, db_path='users.db'):
-        self.db_path = db_path
-        self._init_db()
-    
-    def _init_db(self):
-        """Initialize the database and create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create users table
-        cursor.execute('''
+    # Entry i upgrades the users schema from version i to i + 1
+    MIGRATIONS = [
+        [
+            '''
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
@@ -21,68 +24,127 @@ class DatabaseManager:
                 email TEXT UNIQUE NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        ''')
-        
-        conn.commit()
-        conn.close()
+            '''
+        ]
+    ]
+
+    def __init__(self, db_path='users.db'):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self.hasher = get_password_hasher()
+        self._init_db()
+    
+    def _init_db(self):
+        """Bring the schema up to date (runs once per database per process)"""
+        self.pool.migrate('users', self.MIGRATIONS)
     
+    @metrics.timed('auth_seconds', op='create_user')
     def create_user(self, username, password, email):
         """Create a new user"""
         try:
-            # Hash the password
-            salt = bcrypt.gensalt()
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
+            # Hash the password on the shared bcrypt pool
+            password_hash = self.hasher.hash(password)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
-                (username, password_hash, email)
-            )
-            
-            conn.commit()
-            conn.close()
+            with metrics.timer('db_query_seconds', op='insert_user'), self.pool.connection() as conn:
+                conn.execute(
+                    'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
+                    (username, password_hash, email)
+                )
             return True
         except sqlite3.IntegrityError:
             return False  # Username or email already exists
-        except Exception as e:
-            print(f"Error creating user: {e}")
+        except HasherBusyError:
+            raise
+        except Exception:
+            logger.exception("Error creating user")
+            metrics.inc('db_errors_total', op='create_user')
             return False
     
+    @metrics.timed('auth_seconds', op='verify_user')
     def verify_user(self, username, password):
         """Verify user credentials"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT password_hash FROM users WHERE username = ?', (username,))
-            result = cursor.fetchone()
-            
-            conn.close()
+            with metrics.timer('db_query_seconds', op='select_password_hash'), self.pool.connection() as conn:
+                result = conn.execute(
+                    'SELECT password_hash FROM users WHERE username = ?', (username,)
+                ).fetchone()
             
             if result:
-                stored_hash = result[0]
-                return bcrypt.checkpw(password.encode('utf-8'), stored_hash)
+                valid, new_hash = self.hasher.verify(password, result[0])
+                if new_hash:
+                    # Stored hash used a different work factor; upgrade it transparently
+                    with metrics.timer('db_query_seconds', op='update_password_hash'), \
+                            self.pool.connection() as conn:
+                        conn.execute(
+                            'UPDATE users SET password_hash = ? WHERE username = ?',
+                            (new_hash, username)
+                        )
+                    metrics.inc('password_rehash_total')
+                return valid
             return False
-        except Exception as e:
-            print(f"Error verifying user: {e}")
+        except HasherBusyError:
+            raise
+        except Exception:
+            logger.exception("Error verifying user")
+            metrics.inc('db_errors_total', op='verify_user')
             return False
     
+    @metrics.timed('db_query_seconds', op='user_exists')
     def user_exists(self, username=None, email=None):
         """Check if a user exists by username or email"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if username:
-                cursor.execute('SELECT 1 FROM users WHERE username = ?', (username,))
-            elif email:
-                cursor.execute('SELECT 1 FROM users WHERE email = ?', (email,))
-            
-            result = cursor.fetchone() is not None
-            conn.close()
-            return result
-        except Exception as e:
-            print(f"Error checking user existence: {e}")
+            if not username and not email:
+                return False
+            with self.pool.connection() as conn:
+                if username:
+                    cursor = conn.execute('SELECT 1 FROM users WHERE username = ?', (username,))
+                else:
+                    cursor = conn.execute('SELECT 1 FROM users WHERE email = ?', (email,))
+                return cursor.fetchone() is not None
+        except Exception:
+            logger.exception("Error checking user existence")
+            metrics.inc('db_errors_total', op='user_exists')
             return False
+
+    def import_json_users(self, json_path):
+        """Import users from the legacy data/users.json store
+
+        Password hashes are copied as-is. Users whose username or email already
+        exists are skipped. Returns (imported, skipped).
+        """
+        with open(json_path, 'r') as f:
+            users = json.load(f)
+
+        imported = 0
+        with self.pool.transaction() as conn:
+            for username, user_data in users.items():
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO users (username, password_hash, email) VALUES (?, ?, ?)',
+                    (username, user_data['password'], user_data.get('email') or username)
+                )
+                imported += cursor.rowcount
+        return imported, len(users) - imported
+
+
+def migrate_json_users(json_path='data/users.json', db_path='users.db'):
+    """One-shot migration of the JSON user store into SQLite
+
+    The JSON file is renamed to <name>.migrated afterwards so the import
+    never runs twice. Returns (imported, skipped), or None if there was
+    nothing to migrate.
+    """
+    with _json_migration_lock:
+        if not os.path.exists(json_path):
+            return None
+        result = DatabaseManager(db_path).import_json_users(json_path)
+        os.replace(json_path, json_path + '.migrated')
+        return result
+
+
+if __name__ == '__main__':
+    json_path = sys.argv[1] if len(sys.argv) > 1 else 'data/users.json'
+    result = migrate_json_users(json_path)
+    if result is None:
+        print(f"Nothing to migrate: {json_path} not found")
+    else:
+        print(f"Imported {result[0]} users, skipped {result[1]} existing")
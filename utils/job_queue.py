@@ -0,0 +1,387 @@
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from config.settings import (
+    JOB_WORKERS, JOB_RETENTION_SECONDS, JOB_HEARTBEAT_INTERVAL, JOB_HEARTBEAT_TIMEOUT, PREFETCH_ENABLED
+)
+from utils import metrics
+from utils.response_cache import make_cache_key
+from utils.sqlite_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def run_generation_job(username, user_info, report):
+    """Default job handler: AI generation followed by PDF rendering
+
+    report(progress, message, partial) publishes progress while the job runs.
+    Returns (resume_content, pdf_bytes, reused_sections).
+    """
+    from utils.ai_generator import get_ai_generator
+    from utils.pdf_generator import PDFGenerator
+    from utils.prefetch import get_prefetcher
+    from utils.resume_store import ResumeStore
+
+    ai_generator = get_ai_generator()
+    store = ResumeStore()
+    known_sections = store.load_sections(username)
+
+    # Sections whose inputs are unchanged since the last generation are reused.
+    # Prefetched sections come from the cache, and ones still being prefetched
+    # are joined by the single-flight layer rather than sent again.
+    partial = {'summary': '', 'experience': {}, 'skills': ''}
+    resume_content = None
+    try:
+        for event in ai_generator.generate_content_stream(user_info, known_sections):
+            if event['type'] == 'complete':
+                resume_content = event['content']
+                break
+
+            section, index = event['section'], event['index']
+            if event['type'] == 'chunk':
+                if section == 'experience':
+                    partial['experience'][index] = partial['experience'].get(index, '') + event['text']
+                else:
+                    partial[section] += event['text']
+                report(None, None, partial)
+            elif event['type'] == 'section_done':
+                if section == 'experience':
+                    partial['experience'][index] = event['text']
+                    label = f"experience {index + 1}"
+                else:
+                    partial[section] = event['text']
+                    label = section
+                # One extra step is reserved for building the PDF
+                report(
+                    event['completed'] / (event['total'] + 1),
+                    f"Enhanced {label} ({event['completed']}/{event['total']})",
+                    partial
+                )
+    finally:
+        if PREFETCH_ENABLED:
+            # Whatever is still prefetched for this user is superseded by this generation
+            get_prefetcher().cancel(username)
+
+    sections = ai_generator.section_contents(user_info, resume_content)
+    store.save_sections(username, sections)
+
+    report(None, "Building PDF...", partial)
+    pdf_bytes = PDFGenerator().generate_pdf(resume_content)
+    return resume_content, pdf_bytes, len(sections.keys() & known_sections.keys())
+
+
+class JobQueue:
+    """Resume generation jobs run by in-process worker threads and tracked in SQLite
+
+    Jobs outlive the Streamlit script run that submitted them, so a rerun or a
+    closed tab does not lose the work; the UI polls get() for status. The
+    number of worker threads caps concurrent generations on this node.
+
+    Several processes may share the database. Each claims jobs under its own
+    owner id and keeps a heartbeat on the ones it runs, so only jobs whose
+    owner has gone quiet (crashed or restarted) are handed to another worker.
+    """
+
+    # Entry i upgrades the jobs schema from version i to i + 1
+    MIGRATIONS = [
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS generation_jobs (
+                id TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                resume_content TEXT,
+                pdf BLOB,
+                reused_sections INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                error_type TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            ''',
+            '''
+            CREATE INDEX IF NOT EXISTS idx_generation_jobs_user
+            ON generation_jobs (username, status)
+            '''
+        ],
+        [
+            'ALTER TABLE generation_jobs ADD COLUMN input_hash TEXT'
+        ],
+        [
+            'ALTER TABLE generation_jobs ADD COLUMN owner TEXT',
+            'ALTER TABLE generation_jobs ADD COLUMN heartbeat_at REAL'
+        ]
+    ]
+
+    def __init__(self, db_path='users.db', workers=JOB_WORKERS, handler=run_generation_job,
+                 heartbeat_interval=JOB_HEARTBEAT_INTERVAL, heartbeat_timeout=JOB_HEARTBEAT_TIMEOUT):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self.workers = workers
+        self.handler = handler
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        # Marks the jobs this process's workers claim
+        self.owner = uuid.uuid4().hex
+        self._queue = queue.Queue()
+        self._partials = {}
+        self._partials_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._threads = []
+        self._init_db()
+
+    def _init_db(self):
+        """Bring the schema up to date (runs once per database per process)"""
+        self.pool.migrate('generation_jobs', self.MIGRATIONS)
+
+    def start(self):
+        """Start the worker threads and re-enqueue jobs interrupted by a restart"""
+        if self._threads:
+            return
+        self.requeue_stale()
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id FROM generation_jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        for (job_id,) in rows:
+            self._queue.put(job_id)
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"generation-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name="generation-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def requeue_stale(self):
+        """Set running jobs whose owner stopped sending heartbeats back to queued; return their ids
+
+        Jobs another live process is running keep their status, however
+        long they take.
+        """
+        with self.pool.transaction() as conn:
+            rows = conn.execute(
+                '''
+                SELECT id FROM generation_jobs
+                WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+                ''',
+                (time.time() - self.heartbeat_timeout,)
+            ).fetchall()
+            conn.executemany(
+                '''
+                UPDATE generation_jobs SET status = 'queued', progress = 0, owner = NULL,
+                    message = 'Waiting for a free worker...', updated_at = ?
+                WHERE id = ?
+                ''',
+                [(time.time(), job_id) for (job_id,) in rows]
+            )
+        if rows:
+            logger.warning("Re-queued %d generation job(s) abandoned by their worker", len(rows))
+            metrics.inc('generation_jobs_requeued_total', len(rows))
+        return [job_id for (job_id,) in rows]
+
+    def submit(self, username, user_info):
+        """Queue a generation for username and return its job id
+
+        If the user already has a queued or running job for the same
+        user_info, that job's id is returned instead of starting a duplicate.
+        A queued job for different user_info is updated with the new inputs.
+        A running one can't be interrupted: it finishes, but a new job is
+        queued for the new inputs.
+        """
+        input_hash = make_cache_key(user_info)
+        payload = json.dumps(user_info)
+        with self._submit_lock, self.pool.connection() as conn:
+            rows = conn.execute(
+                '''
+                SELECT id, status, input_hash FROM generation_jobs
+                WHERE username = ? AND status IN ('queued', 'running')
+                ORDER BY created_at DESC
+                ''',
+                (username,)
+            ).fetchall()
+            for job_id, _, job_hash in rows:
+                if job_hash == input_hash:
+                    return job_id
+            for job_id, status, _ in rows:
+                # Conditional, so a worker claiming the job in the meantime keeps the payload it read
+                if status == 'queued' and conn.execute(
+                    '''
+                    UPDATE generation_jobs SET payload = ?, input_hash = ?, updated_at = ?
+                    WHERE id = ? AND status = 'queued'
+                    ''',
+                    (payload, input_hash, time.time(), job_id)
+                ).rowcount:
+                    metrics.inc('generation_jobs_superseded_total', status='queued')
+                    return job_id
+            if rows:
+                metrics.inc('generation_jobs_superseded_total', status='running')
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                '''
+                INSERT INTO generation_jobs (id, username, status, payload, input_hash, message, created_at, updated_at)
+                VALUES (?, ?, 'queued', ?, ?, 'Waiting for a free worker...', ?, ?)
+                ''',
+                (job_id, username, payload, input_hash, now, now)
+            )
+        self.purge_finished()
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        """Return a job's status (without the PDF bytes), or None if it doesn't exist"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                '''
+                SELECT id, username, status, progress, message, resume_content, reused_sections,
+                       error, error_type, pdf IS NOT NULL, payload
+                FROM generation_jobs WHERE id = ?
+                ''',
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        with self._partials_lock:
+            partial = self._partials.get(job_id)
+        return {
+            'id': row[0],
+            'username': row[1],
+            'status': row[2],
+            'progress': row[3],
+            'message': row[4],
+            'resume_content': json.loads(row[5]) if row[5] else None,
+            'reused_sections': row[6],
+            'error': row[7],
+            'error_type': row[8],
+            'has_pdf': bool(row[9]),
+            'user_info': json.loads(row[10]),
+            'partial': partial
+        }
+
+    def get_pdf(self, job_id):
+        """Return the rendered PDF bytes of a finished job, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT pdf FROM generation_jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        return bytes(row[0]) if row and row[0] is not None else None
+
+    def purge_finished(self, older_than=JOB_RETENTION_SECONDS):
+        """Delete finished jobs last updated more than older_than seconds ago"""
+        with self.pool.connection() as conn:
+            conn.execute(
+                "DELETE FROM generation_jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (time.time() - older_than,)
+            )
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self.pool.connection() as conn:
+            # A job re-queued from under this process (e.g. after a long stall) isn't ours to update
+            conn.execute(
+                f'UPDATE generation_jobs SET {assignments} WHERE id = ? AND owner = ?',
+                list(fields.values()) + [job_id, self.owner]
+            )
+
+    def _heartbeat(self):
+        """Keep this process's running jobs marked alive and pick up ones other processes abandoned"""
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                with self.pool.connection() as conn:
+                    conn.execute(
+                        "UPDATE generation_jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                        (time.time(), self.owner)
+                    )
+                for job_id in self.requeue_stale():
+                    self._queue.put(job_id)
+            except Exception:
+                logger.exception("Error updating generation job heartbeats")
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        with self.pool.connection() as conn:
+            # Claim the job before reading its payload, which submit() may replace while it is queued
+            claimed = conn.execute(
+                '''
+                UPDATE generation_jobs SET status = 'running', message = 'Generating your resume...',
+                    owner = ?, heartbeat_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'queued'
+                ''',
+                (self.owner, time.time(), time.time(), job_id)
+            ).rowcount
+            if not claimed:
+                return
+            row = conn.execute(
+                'SELECT username, payload FROM generation_jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        username, payload = row[0], json.loads(row[1])
+        start = time.perf_counter()
+
+        def report(progress, message, partial):
+            snapshot = copy.deepcopy(partial)
+            with self._partials_lock:
+                self._partials[job_id] = snapshot
+            fields = {}
+            if progress is not None:
+                fields['progress'] = progress
+            if message is not None:
+                fields['message'] = message
+            if fields:
+                self._update(job_id, **fields)
+
+        try:
+            resume_content, pdf_bytes, reused = self.handler(username, payload, report)
+            self._update(
+                job_id,
+                status='done',
+                progress=1.0,
+                message='Resume ready',
+                resume_content=json.dumps(resume_content),
+                pdf=pdf_bytes,
+                reused_sections=reused
+            )
+            metrics.observe('generation_job_seconds', time.perf_counter() - start, status='done')
+        except Exception as e:
+            logger.exception("Error running generation job %s", job_id)
+            metrics.observe('generation_job_seconds', time.perf_counter() - start, status='failed')
+            self._update(job_id, status='failed', message='Generation failed',
+                         error=str(e), error_type=type(e).__name__)
+        finally:
+            with self._partials_lock:
+                self._partials.pop(job_id, None)
+
+
+def get_job_queue():
+    """Return the process-wide job queue, starting its workers on first use"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                job_queue = JobQueue()
+                job_queue.start()
+                _job_queue = job_queue
+    return _job_queue
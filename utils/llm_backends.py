@@ -0,0 +1,188 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from utils import metrics
+from config.settings import (
+    GOOGLE_API_KEY, LLM_BACKEND, LLM_MODEL_NAME,
+    FAKE_LLM_LATENCY, FAKE_LLM_ERROR_RATE, FAKE_LLM_SEED
+)
+
+
+class TransientBackendError(Exception):
+    """A retryable backend failure (the fake backend's stand-in for a 429)"""
+
+
+class LLMBackend:
+    """Interface AIGenerator depends on to talk to a language model"""
+
+    model_name = None
+
+    def generate(self, prompt):
+        """Return the full response text for prompt"""
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """Send prompt and return an iterator over response text chunks
+
+        The request itself must be made before returning so that failures
+        can be retried by the caller.
+        """
+        return iter([self.generate(prompt)])
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google-generativeai"""
+
+    def __init__(self, model_name=LLM_MODEL_NAME, api_key=GOOGLE_API_KEY):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def _count_tokens(self, response):
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            metrics.inc('llm_tokens_total', usage.prompt_token_count, backend=self.model_name, kind='prompt')
+            metrics.inc('llm_tokens_total', usage.candidates_token_count, backend=self.model_name, kind='completion')
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt)
+        self._count_tokens(response)
+        return response.text
+
+    def stream(self, prompt):
+        response = self.model.generate_content(prompt, stream=True)
+        return self._iter_chunks(response)
+
+    def _iter_chunks(self, response):
+        for chunk in response:
+            yield chunk.text
+        self._count_tokens(response)
+
+
+class FakeBackend(LLMBackend):
+    """Offline backend producing deterministic resume text for load tests and benchmarks
+
+    Responses depend only on the prompt, so the same input always gives the
+    same output. latency (seconds per call) and error_rate (fraction of calls
+    raising TransientBackendError) simulate a remote model.
+    """
+
+    model_name = 'fake'
+
+    VERBS = ['Led', 'Delivered', 'Built', 'Optimized', 'Launched', 'Automated', 'Scaled', 'Redesigned']
+    OUTCOMES = [
+        'reducing turnaround time by {n}%',
+        'increasing team throughput by {n}%',
+        'saving {n} engineering hours per quarter',
+        'growing active usage by {n}%',
+        'cutting operating costs by {n}%'
+    ]
+
+    def __init__(self, latency=FAKE_LLM_LATENCY, error_rate=FAKE_LLM_ERROR_RATE, seed=FAKE_LLM_SEED,
+                 chunks=8):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.chunks = chunks
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise TransientBackendError("429 Resource exhausted (simulated)")
+
+    def _rng(self, text):
+        return random.Random(hashlib.sha256(text.encode('utf-8')).hexdigest())
+
+    def _bullets(self, subject, rng):
+        lines = []
+        for _ in range(rng.randint(4, 5)):
+            verb = rng.choice(self.VERBS)
+            outcome = rng.choice(self.OUTCOMES).format(n=rng.randint(10, 60))
+            lines.append(f"* {verb} {subject} initiatives, {outcome}")
+        return '\n'.join(lines)
+
+    def _summary(self, rng):
+        years = rng.randint(3, 15)
+        return (
+            f"Results-driven professional with {years}+ years of experience delivering "
+            f"measurable impact across cross-functional teams. Known for "
+            f"{rng.choice(self.OUTCOMES).format(n=rng.randint(10, 60))} and building "
+            f"scalable, reliable solutions."
+        )
+
+    def _skills(self, skills):
+        skills = [s.strip() for s in skills if s.strip()] or ['Communication']
+        return (
+            f"TECHNICAL SKILLS: {' | '.join(skills)}\n"
+            f"SOFT SKILLS: Leadership | Collaboration | Problem Solving"
+        )
+
+    def _respond(self, prompt):
+        text = self._compose(prompt)
+        # Whitespace-separated words stand in for tokens
+        metrics.inc('llm_tokens_total', len(prompt.split()), backend=self.model_name, kind='prompt')
+        metrics.inc('llm_tokens_total', len(text.split()), backend=self.model_name, kind='completion')
+        return text
+
+    def _compose(self, prompt):
+        rng = self._rng(prompt)
+        if 'INPUT:' in prompt:
+            start = prompt.index('{', prompt.index('INPUT:'))
+            pending, _ = json.JSONDecoder().raw_decode(prompt[start:])
+            response = {}
+            if 'experience' in pending:
+                response['experience'] = [
+                    {'index': exp['index'], 'achievements': self._bullets(exp['position'] or 'key', rng)}
+                    for exp in pending['experience']
+                ]
+            if 'summary' in pending:
+                response['professional_summary'] = self._summary(rng)
+            if 'skills' in pending:
+                response['skills'] = self._skills(pending['skills'])
+            return json.dumps(response)
+        if 'CATEGORY NAME' in prompt:
+            match = re.search(r'Given these skills:\s*(.*)', prompt)
+            return self._skills(match.group(1).split(',') if match else [])
+        if "bullet points starting with '*'" in prompt:
+            match = re.search(r'Position: (.*)', prompt)
+            return self._bullets(match.group(1).strip() if match else 'key', rng)
+        return self._summary(rng)
+
+    def generate(self, prompt):
+        self._maybe_fail()
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt)
+
+    def stream(self, prompt):
+        self._maybe_fail()
+        text = self._respond(prompt)
+        size = max(1, -(-len(text) // self.chunks))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        return self._trickle(pieces)
+
+    def _trickle(self, pieces):
+        for piece in pieces:
+            if self.latency:
+                time.sleep(self.latency / len(pieces))
+            yield piece
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend
+}
+
+
+def create_backend(name=LLM_BACKEND):
+    """Instantiate the backend registered under name"""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,143 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from utils import metrics
+from config.settings import (
+    BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_QUEUE_TIMEOUT
+)
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full, so callers can shed load"""
+
+
+def get_cost(password_hash):
+    """Return the bcrypt work factor encoded in a hash such as $2b$12$..."""
+    if isinstance(password_hash, bytes):
+        password_hash = password_hash.decode('utf-8')
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool instead of the caller's thread
+
+    At most workers + queue_limit operations are admitted at once; further
+    callers wait up to queue_timeout seconds for a slot and then get
+    HasherBusyError. bcrypt releases the GIL, so the workers hash in parallel.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=PASSWORD_HASH_WORKERS,
+                 queue_limit=PASSWORD_HASH_QUEUE_LIMIT, queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def _run(self, func, *args):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            metrics.inc('password_hash_rejected_total')
+            raise HasherBusyError("Too many password operations in progress, please try again")
+        try:
+            future = self._executor.submit(self._timed, start, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def _timed(self, submitted_at, func, *args):
+        started = time.perf_counter()
+        metrics.observe('password_hash_queue_wait_seconds', started - submitted_at)
+        try:
+            return func(*args)
+        finally:
+            metrics.observe('password_hash_seconds', time.perf_counter() - started, op=func.__name__)
+
+    def hash(self, password):
+        """Hash a password at the configured cost and return it as text"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different cost than configured"""
+        return get_cost(password_hash) != self.rounds
+
+    def verify(self, password, password_hash):
+        """Check a password against a stored hash
+
+        Returns (valid, new_hash) where new_hash is a fresh hash at the
+        configured cost if the stored one should be replaced, otherwise None.
+        The upgrade is skipped when the pool is busy; a later login retries it.
+        """
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        valid = self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash)
+        if valid and self.needs_rehash(password_hash):
+            try:
+                return True, self.hash(password)
+            except HasherBusyError:
+                metrics.inc('password_rehash_deferred_total')
+        return valid, None
+
+    def shutdown(self):
+        """Stop the worker threads once queued operations finish"""
+        self._executor.shutdown(wait=True)
+
+
+def get_password_hasher():
+    """Return the process-wide password hasher"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
+
+
+def benchmark(costs, seconds=2.0, workers=PASSWORD_HASH_WORKERS):
+    """Measure bcrypt verify throughput at each cost, single-threaded and on the pool"""
+    results = []
+    for cost in costs:
+        password_hash = bcrypt.hashpw(b'benchmark-password', bcrypt.gensalt(rounds=cost))
+        hasher = PasswordHasher(rounds=cost, workers=workers, queue_limit=workers * 4)
+
+        start = time.perf_counter()
+        single = 0
+        while time.perf_counter() - start < seconds:
+            bcrypt.checkpw(b'benchmark-password', password_hash)
+            single += 1
+        single_rate = single / (time.perf_counter() - start)
+
+        batch = max(workers, int(single_rate * seconds))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+            list(clients.map(lambda _: hasher.verify('benchmark-password', password_hash), range(batch)))
+        pooled_rate = batch / (time.perf_counter() - start)
+        hasher.shutdown()
+
+        results.append({'cost': cost, 'single_thread_per_sec': single_rate, 'pooled_per_sec': pooled_rate})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="bcrypt verify throughput at each work factor")
+    parser.add_argument('--costs', default='10,11,12,13', help="comma-separated bcrypt costs")
+    parser.add_argument('--seconds', type=float, default=2.0, help="measurement time per cost")
+    parser.add_argument('--workers', type=int, default=PASSWORD_HASH_WORKERS, help="pool size")
+    args = parser.parse_args()
+
+    costs = [int(cost) for cost in args.costs.split(',')]
+    print(f"{'cost':>4}  {'1 thread/s':>10}  {f'{args.workers} workers/s':>12}  ({os.cpu_count()} CPUs)")
+    for row in benchmark(costs, args.seconds, args.workers):
+        print(f"{row['cost']:>4}  {row['single_thread_per_sec']:>10.1f}  {row['pooled_per_sec']:>12.1f}")
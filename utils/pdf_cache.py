@@ -0,0 +1,190 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config.settings import PDF_CACHE_MAX_BYTES, PDF_CACHE_DB_PATH, PDF_CACHE_DISK_MAX_BYTES
+from utils import metrics
+from utils.sqlite_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+
+
+class PDFCache:
+    """Two-tier cache of rendered PDFs: an in-process LRU and an optional SQLite store
+
+    Both tiers are bounded by total bytes rather than entry count, since a
+    one-page resume and a twenty-page one differ by an order of magnitude.
+    Keys are content hashes, so entries never go stale and have no TTL.
+    """
+
+    # Entry i upgrades the PDF cache schema from version i to i + 1
+    MIGRATIONS = [
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS pdf_cache (
+                cache_key TEXT PRIMARY KEY,
+                pdf BLOB NOT NULL,
+                pages INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            ''',
+            '''
+            CREATE INDEX IF NOT EXISTS idx_pdf_cache_last_used ON pdf_cache (last_used)
+            '''
+        ]
+    ]
+
+    def __init__(self, max_bytes=PDF_CACHE_MAX_BYTES, db_path=None, disk_max_bytes=PDF_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'disk_evictions': 0
+        }
+        self.pool = get_pool(db_path) if db_path else None
+        if self.pool:
+            self._init_db()
+
+    def _init_db(self):
+        """Create the persistent cache table if it doesn't exist"""
+        self.pool.migrate('pdf_cache', self.MIGRATIONS)
+
+    def get(self, key):
+        """Return (pdf_bytes, page_count) for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return entry
+
+        if self.pool:
+            entry = self._disk_get(key)
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, entry)
+                    self.stats['disk_hits'] += 1
+                return entry
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key, pdf_bytes, pages):
+        """Store a rendered PDF under key in every enabled tier"""
+        entry = (pdf_bytes, pages)
+        with self._lock:
+            self._remember(key, entry)
+        if self.pool:
+            self._disk_set(key, entry)
+
+    def _remember(self, key, entry):
+        """Insert into the LRU tier, evicting until it fits in max_bytes (lock held)"""
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[0])
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def _disk_get(self, key):
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute('SELECT pdf, pages FROM pdf_cache WHERE cache_key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute('UPDATE pdf_cache SET last_used = ? WHERE cache_key = ?', (time.time(), key))
+            return bytes(row[0]), row[1]
+        except sqlite3.Error as e:
+            logger.error("Error reading PDF cache: %s", e)
+            return None
+
+    def _disk_set(self, key, entry):
+        pdf_bytes, pages = entry
+        try:
+            with self.pool.transaction() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO pdf_cache (cache_key, pdf, pages, size, last_used) VALUES (?, ?, ?, ?, ?)',
+                    (key, pdf_bytes, pages, len(pdf_bytes), time.time())
+                )
+                self._disk_evict(conn)
+        except sqlite3.Error as e:
+            logger.error("Error writing PDF cache: %s", e)
+
+    def _disk_evict(self, conn):
+        """Delete least recently used rows until the table fits in disk_max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM pdf_cache').fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute('SELECT cache_key, size FROM pdf_cache ORDER BY last_used'):
+            if total <= self.disk_max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM pdf_cache WHERE cache_key = ?', stale)
+        with self._lock:
+            self.stats['disk_evictions'] += len(stale)
+
+    def clear(self):
+        """Empty the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Return a snapshot of the hit/miss counters and memory usage"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def get_pdf_cache():
+    """Return the process-wide rendered PDF cache, creating it on first use"""
+    global _pdf_cache
+    if _pdf_cache is None:
+        with _pdf_cache_lock:
+            if _pdf_cache is None:
+                _pdf_cache = PDFCache(db_path=PDF_CACHE_DB_PATH)
+    return _pdf_cache
+
+
+def _collect_pdf_cache_stats():
+    """Expose the rendered PDF cache counters to the metrics registry"""
+    if _pdf_cache is None:
+        return []
+    stats = _pdf_cache.get_stats()
+    collected = [
+        (f'pdf_cache_{name}_total', 'counter', {}, stats[name])
+        for name in ('memory_hits', 'disk_hits', 'misses', 'evictions', 'disk_evictions')
+    ]
+    collected.append(('pdf_cache_entries', 'gauge', {}, stats['entries']))
+    collected.append(('pdf_cache_bytes', 'gauge', {}, stats['bytes']))
+    collected.append(('pdf_cache_hit_ratio', 'gauge', {}, stats['hit_rate']))
+    return collected
+
+
+metrics.register_collector(_collect_pdf_cache_stats)
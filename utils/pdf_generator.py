@@ -1,132 +1,488 @@
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Table, TableStyle
 from reportlab.platypus.flowables import HRFlowable
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from collections import OrderedDict, namedtuple
+from functools import partial
+from io import BytesIO
+from types import MappingProxyType
+from xml.sax.saxutils import escape
+import json
 import os
+import threading
+import time
+from config.settings import (
+    FONT_SIZES, SPACING, RESUME_SECTIONS, PDF_MARGINS, PAGE_SIZE, PDF_TEMPLATE, PDF_TEMPLATE_DIR,
+    PDF_FLOWABLE_CACHE_SIZE
+)
+from utils import metrics
+from utils.pdf_cache import get_pdf_cache
+from utils.response_cache import make_cache_key
 
-class PDFGenerator:
-    def __init__(self, output_file):
-        self.output_file = output_file
-        self.width, self.height = letter
-        
-        # Register custom fonts
-        font_dir = os.path.join(os.path.dirname(__file__), '..', 'assets', 'fonts')
-        os.makedirs(font_dir, exist_ok=True)
-        
-        # Modern color scheme
-        self.colors = {
-            'primary': colors.HexColor('#1A237E'),  # Dark blue - more professional
-            'secondary': colors.HexColor('#0D47A1'),  # Medium blue
-            'accent': colors.HexColor('#1565C0'),  # Light blue - less aggressive than red
-            'text': colors.HexColor('#212121'),  # Near black - better readability
-            'subtext': colors.HexColor('#424242')  # Darker gray - improved contrast
+# Colour schemes and font sets available to PDFGenerator, keyed by theme name
+THEMES = {
+    'default': {
+        'colors': {
+            'primary': '#1A237E',  # Dark blue - more professional
+            'secondary': '#0D47A1',  # Medium blue
+            'accent': '#1565C0',  # Light blue - less aggressive than red
+            'text': '#212121',  # Near black - better readability
+            'subtext': '#424242'  # Darker gray - improved contrast
+        },
+        'fonts': {
+            'regular': 'Helvetica',
+            'bold': 'Helvetica-Bold',
+            'italic': 'Helvetica-Oblique'
         }
-        
-        # Define styles
-        self.styles = getSampleStyleSheet()
-        self.define_styles()
-        
-    def define_styles(self):
-        """Define custom styles for the resume"""
-        # Header style
-        self.styles.add(ParagraphStyle(
-            name='ResumeHeader',
-            fontSize=28,
-            leading=34,
-            textColor=self.colors['primary'],
-            spaceAfter=12,
-            spaceBefore=24,
-            fontName='Helvetica-Bold',
-            alignment=1  # Center alignment
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='ResumeSectionHeader',
-            fontSize=18,
-            leading=22,
-            textColor=self.colors['secondary'],
-            spaceAfter=4,
-            spaceBefore=16,
-            fontName='Helvetica-Bold'
-        ))
+    },
+    'classic': {
+        'colors': {
+            'primary': '#111111',
+            'secondary': '#333333',
+            'accent': '#555555',
+            'text': '#212121',
+            'subtext': '#4A4A4A'
+        },
+        'fonts': {
+            'regular': 'Times-Roman',
+            'bold': 'Times-Bold',
+            'italic': 'Times-Italic'
+        }
+    }
+}
 
-        # Add new styles for better content hierarchy
-        self.styles.add(ParagraphStyle(
-            name='ResumeSubHeader',
-            fontSize=14,
-            leading=18,
-            textColor=self.colors['primary'],
-            spaceAfter=8,
-            fontName='Helvetica-Bold'
-        ))
+# Settings a template may reference as "$NAME" or "$NAME.key"
+TEMPLATE_SETTINGS = {
+    'FONT_SIZES': FONT_SIZES,
+    'SPACING': SPACING,
+    'RESUME_SECTIONS': RESUME_SECTIONS,
+    'PDF_MARGINS': PDF_MARGINS,
+    'PAGE_SIZE': PAGE_SIZE
+}
 
-        self.styles.add(ParagraphStyle(
-            name='ResumeBody',
-            fontSize=12,
-            leading=16,
-            textColor=self.colors['text'],
-            spaceAfter=8,
-            fontName='Helvetica',
-            bulletIndent=20,
-            leftIndent=20
-        ))
+PAGE_SIZES = {'letter': letter, 'a4': A4}
 
-        self.styles.add(ParagraphStyle(
-            name='ResumeMetadata',
-            fontSize=11,
-            leading=14,
-            textColor=self.colors['subtext'],
-            spaceAfter=4,
-            fontName='Helvetica-Oblique'
-        ))
+ALIGNMENTS = {'left': TA_LEFT, 'center': TA_CENTER, 'right': TA_RIGHT, 'justify': TA_JUSTIFY}
+
+# Section types for the titles listed in RESUME_SECTIONS
+SECTION_TITLES = {
+    'CONTACT INFORMATION': 'contact',
+    'PROFESSIONAL SUMMARY': 'summary',
+    'WORK EXPERIENCE': 'experience',
+    'EDUCATION': 'education',
+    'SKILLS': 'skills'
+}
+
+# resume_content fields each section type renders; a section is rebuilt only when these change
+SECTION_FIELDS = {
+    'contact': ('name', 'email', 'phone', 'location', 'linkedin', 'github'),
+    'summary': ('professional_summary',),
+    'experience': ('experience',),
+    'education': ('education',),
+    'skills': ('skills',)
+}
+
+# A template compiled against a theme: everything a render needs, read-only and shared
+Layout = namedtuple('Layout', [
+    'template', 'version', 'theme', 'colors', 'styles', 'pagesize', 'margins', 'rule', 'bullets', 'sections'
+])
+
+_compiled_layouts = {}
+_compiled_layouts_lock = threading.Lock()
+
+
+def _resolve(value):
+    """Replace "$NAME" / "$NAME.key" references to TEMPLATE_SETTINGS throughout a template spec"""
+    if isinstance(value, dict):
+        return {key: _resolve(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item) for item in value]
+    if isinstance(value, str) and value.startswith('$'):
+        name, _, key = value[1:].partition('.')
+        if name not in TEMPLATE_SETTINGS:
+            raise ValueError(f"Template references unknown setting '{name}'")
+        setting = TEMPLATE_SETTINGS[name]
+        return setting[int(key) if isinstance(setting, list) else key] if key else setting
+    return value
+
+
+def available_templates(template_dir=PDF_TEMPLATE_DIR):
+    """Return the names of the templates in template_dir"""
+    return sorted(file[:-5] for file in os.listdir(template_dir) if file.endswith('.json'))
+
+
+def load_template(name, template_dir=PDF_TEMPLATE_DIR):
+    """Read a template spec from <template_dir>/<name>.json with setting references resolved"""
+    # Names are matched against the directory listing, never joined into a path unchecked
+    available = available_templates(template_dir)
+    if name not in available:
+        raise ValueError(f"Unknown template '{name}', expected one of {available}")
+    path = os.path.join(template_dir, f"{name}.json")
+    with open(path, 'r', encoding='utf-8') as f:
+        return _resolve(json.load(f))
+
+
+def _build_styles(specs, palette, fonts):
+    """Build the resume paragraph styles a template declares for a colour palette and font set"""
+    styles = {}
+    for name, spec in specs.items():
+        options = dict(spec)
+        if 'parent' in options:
+            options['parent'] = styles[options['parent']]
+        if 'textColor' in options:
+            options['textColor'] = palette[options['textColor']]
+        if 'fontName' in options:
+            options['fontName'] = fonts[options['fontName']]
+        if 'alignment' in options:
+            options['alignment'] = ALIGNMENTS[options['alignment']]
+        styles[name] = ParagraphStyle(name=name, **options)
+    return styles
+
+
+def _compile_sections(spec):
+    """Turn the template's section list into (type, builder) pairs with the builders bound to their options"""
+    defaults = spec.get('section_defaults', {})
+    compiled = []
+    for section in spec['sections']:
+        if isinstance(section, str):
+            # A RESUME_SECTIONS title: the type is implied and the title is shown as written
+            if section not in SECTION_TITLES:
+                raise ValueError(f"Unknown resume section '{section}'")
+            section = {'type': SECTION_TITLES[section], 'title': section}
+        options = {**defaults, **section}
+        section_type = options.pop('type')
+        if section_type not in SECTION_BUILDERS:
+            raise ValueError(f"Unknown section type '{section_type}'")
+        compiled.append((section_type, partial(SECTION_BUILDERS[section_type], **options)))
+    return tuple(compiled)
+
+
+def _compile_layout(template, theme):
+    if theme not in THEMES:
+        raise ValueError(f"Unknown theme '{theme}', expected one of {sorted(THEMES)}")
+    spec = load_template(template)
+    theme_spec = THEMES[theme]
+    palette = {key: colors.HexColor(value) for key, value in theme_spec['colors'].items()}
+    styles = _build_styles(spec['styles'], palette, theme_spec['fonts'])
+
+    rule = dict(spec.get('rule', {}))
+    rule['color'] = palette[rule.get('color', 'secondary')]
+    bullets = dict(spec.get('bullets', {}))
+    bullets['bulletColor'] = palette[bullets.get('bulletColor', 'accent')]
+
+    return Layout(
+        template=template,
+        version=spec.get('version', 1),
+        theme=theme,
+        colors=MappingProxyType(palette),
+        styles=MappingProxyType(styles),
+        pagesize=PAGE_SIZES[spec['page']['size'].lower()],
+        margins=spec['page']['margins'],
+        rule=MappingProxyType(rule),
+        bullets=MappingProxyType(bullets),
+        sections=_compile_sections(spec)
+    )
+
+
+def get_layout(template=PDF_TEMPLATE, theme='default'):
+    """Return the Layout for a template and theme, compiling it once per process
+
+    The JSON spec is only read and parsed on first use; every later render
+    with the same template and theme shares the compiled, read-only result.
+    """
+    key = (template, theme)
+    layout = _compiled_layouts.get(key)
+    if layout is None:
+        with _compiled_layouts_lock:
+            layout = _compiled_layouts.get(key)
+            if layout is None:
+                layout = _compiled_layouts[key] = _compile_layout(template, theme)
+    return layout
+
+
+def _memoize_wrap(flowable):
+    """Make a flowable remember the size of its last wrap at a given availWidth
+
+    Frame.add wraps every flowable before drawing it. A memoized section is
+    reused at the same width, so the line breaking from its previous render
+    still holds and the stored size is returned without re-wrapping. split()
+    can rewrap internally, so it drops the remembered size. A flowable that is
+    already memoized (an entry inside a memoized section) is returned as is.
+
+    doc.build() marks flowables pushed to the next frame with _postponed and
+    only multiBuild() clears it. reset_layout() clears it from the flowable
+    and from the pieces its splits returned (containers such as ListFlowable
+    hand out their own children), ready for the next document. Only the
+    latest split's pieces are kept: a flowable splits at most once per render.
+    """
+    if 'reset_layout' in vars(flowable):
+        return flowable
+    wrap, split = flowable.wrap, flowable.split
+    memo = {}
+    pieces = []
+
+    def memo_wrap(availWidth, availHeight):
+        if memo.get('width') != availWidth:
+            memo.clear()
+            memo['size'] = wrap(availWidth, availHeight)
+            memo['width'] = availWidth
+        return memo['size']
+
+    def memo_split(availWidth, availHeight):
+        memo.clear()
+        result = split(availWidth, availHeight)
+        pieces[:] = result
+        return result
+
+    def reset_layout():
+        for piece in [flowable] + pieces:
+            # hasattr/delattr rather than __dict__: list indenters proxy attributes to their content
+            if hasattr(piece, '_postponed'):
+                delattr(piece, '_postponed')
+        pieces.clear()
+
+    flowable.wrap, flowable.split, flowable.reset_layout = memo_wrap, memo_split, reset_layout
+    return flowable
+
+
+class _FlowableCache(threading.local):
+    """LRU of built flowables, one per rendering thread
+
+    Flowables keep layout state from their last wrap and must not be laid out
+    by two documents at once, so each thread reuses only what it built itself.
+    """
+
+    def __init__(self, max_entries=PDF_FLOWABLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        flowables = self.entries.get(key)
+        if flowables is not None:
+            self.entries.move_to_end(key)
+        return flowables
+
+    def set(self, key, flowables):
+        self.entries[key] = flowables
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def discard(self, keys):
+        for key in keys:
+            self.entries.pop(key, None)
+
+
+_flowable_cache = _FlowableCache()
+
+
+def _text(value, quote=False):
+    """Escape resume text for a Paragraph, which would otherwise parse it as markup"""
+    return escape(str(value), {'"': '&quot;'} if quote else {})
 
-        # Contact info style
-        self.styles.add(ParagraphStyle(
-            name='ContactInfo',
-            parent=self.styles['ResumeMetadata'],
-            alignment=1,  # Center alignment
-            spaceBefore=4,
-            spaceAfter=4
+
+def _contact_section(generator, content, width, title=None, space_after=0, social_width=0.8, **_):
+    story = []
+    styles = generator.styles
+
+    # Add name as main header
+    name = content.get('name', '').strip()
+    if name:
+        story.append(Paragraph(_text(name), styles['ResumeHeader']))
+    if title:
+        generator.add_section_header(story, title)
+
+    # Add email and phone in first line
+    primary_contact = []
+    if content.get('email'):
+        primary_contact.append(f"Email: {_text(content['email'])}")
+    if content.get('phone'):
+        primary_contact.append(f"Phone: {_text(content['phone'])}")
+    if primary_contact:
+        story.append(Paragraph(' | '.join(primary_contact), styles['ContactInfo']))
+
+    # Add location
+    if content.get('location'):
+        story.append(Paragraph(f"Location: {_text(content['location'])}", styles['ContactInfo']))
+
+    # Add social media links with icons
+    social_elements = generator.create_social_links(
+        linkedin_url=content.get('linkedin'),
+        github_url=content.get('github')
+    )
+    if social_elements:
+        # Create a table for social links to keep them centered and properly spaced
+        social_table = Table([[element] for element in social_elements], colWidths=[width * social_width])
+        social_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]))
+        story.append(social_table)
+
+    if space_after:
+        story.append(Spacer(1, space_after))
+    return story
+
+
+def _summary_section(generator, content, width, title='Professional Summary', space_after=0, **_):
+    if not content.get('professional_summary'):
+        return []
+    story = []
+    generator.add_section_header(story, title)
+    story.append(Paragraph(_text(content['professional_summary']), generator.styles['ResumeBody']))
+    if space_after:
+        story.append(Spacer(1, space_after))
+    return story
+
+
+def _experience_section(generator, content, width, title='Professional Experience', entry_space_after=0, **_):
+    if not content.get('experience'):
+        return []
+    story = []
+    generator.add_section_header(story, title)
+    for exp in content['experience']:
+        # Each entry is memoized on its own so editing one job reuses the others
+        story.extend(generator.memoized(
+            ('experience', width, entry_space_after, exp),
+            partial(_experience_entry, generator, exp, entry_space_after)
         ))
+    return story
+
+
+def _experience_entry(generator, exp, entry_space_after):
+    # Company and position as sub-header
+    story = [Paragraph(
+        f"{_text(exp.get('company', ''))} - {_text(exp.get('position', ''))}",
+        generator.styles['ResumeSubHeader']
+    )]
 
-        # Add style for social media links
-        self.styles.add(ParagraphStyle(
-            name='SocialLinks',
-            fontSize=12,
-            leading=16,
-            textColor=self.colors['primary'],
-            spaceAfter=2,
-            spaceBefore=2,
-            fontName='Helvetica',
-            alignment=1,  # Center alignment
-            linkUnderline=False  # No underline for cleaner look
+    # Duration as metadata
+    if exp.get('duration'):
+        story.append(Paragraph(_text(exp['duration']), generator.styles['ResumeMetadata']))
+
+    # Achievements as bullet points, without any leading asterisk
+    achievements = [
+        achievement.strip().lstrip('*').strip()
+        for achievement in exp.get('achievements', '').split('\n')
+        if achievement.strip()
+    ]
+    if achievements:
+        story.append(generator.create_bullet_list(achievements))
+    if entry_space_after:
+        story.append(Spacer(1, entry_space_after))
+    return story
+
+
+def _education_section(generator, content, width, title='Education', entry_space_after=0, **_):
+    if not content.get('education'):
+        return []
+    story = []
+    generator.add_section_header(story, title)
+    for edu in content['education']:
+        story.extend(generator.memoized(
+            ('education', width, entry_space_after, edu),
+            partial(_education_entry, generator, edu, entry_space_after)
         ))
-        
+    return story
+
+
+def _education_entry(generator, edu, entry_space_after):
+    story = []
+
+    # Institution and degree
+    header_parts = [_text(edu[field]) for field in ('institution', 'degree', 'field_of_study') if edu.get(field)]
+    if header_parts:
+        story.append(Paragraph(' - '.join(header_parts), generator.styles['ResumeSubHeader']))
+
+    # Education details
+    details = []
+    if edu.get('year'):
+        details.append(_text(edu['year']))
+    if edu.get('grade'):
+        details.append(f"Grade: {_text(edu['grade'])}")
+    if edu.get('location'):
+        details.append(_text(edu['location']))
+    if details:
+        story.append(Paragraph(' | '.join(details), generator.styles['ResumeMetadata']))
+
+    # Add achievements if any
+    if edu.get('achievements'):
+        achievements = [achievement.strip() for achievement in edu['achievements'].split('\n')
+                        if achievement.strip()]
+        if achievements:
+            story.append(generator.create_bullet_list(achievements))
+    if entry_space_after:
+        story.append(Spacer(1, entry_space_after))
+    return story
+
+
+def _skills_section(generator, content, width, title='Skills', space_after=0, **_):
+    if not content.get('skills'):
+        return []
+    story = []
+    generator.add_section_header(story, title)
+    story.append(Paragraph(_text(content['skills']), generator.styles['ResumeBody']))
+    if space_after:
+        story.append(Spacer(1, space_after))
+    return story
+
+
+# Section types a template can list, each building the flowables for one part of the resume
+SECTION_BUILDERS = {
+    'contact': _contact_section,
+    'summary': _summary_section,
+    'experience': _experience_section,
+    'education': _education_section,
+    'skills': _skills_section
+}
+
+
+class PDFGenerator:
+    def __init__(self, output_file=None, theme='default', template=PDF_TEMPLATE, reuse_flowables=True,
+                 cache=None, use_cache=True):
+        # Optional path the rendered PDF is also written to; rendering itself happens in memory
+        self.output_file = output_file
+        self.page_count = 0
+        self.theme = theme
+        self.template = template
+        # Reuse flowables built by earlier renders on this thread for unchanged sections
+        self.reuse_flowables = reuse_flowables
+        self._used_keys = []
+        # Identical content renders to identical bytes, so whole PDFs are cached by content hash
+        if use_cache:
+            self.cache = cache if cache is not None else get_pdf_cache()
+        else:
+            self.cache = None
+
+        # Layout, colours and styles come from the shared, precompiled template registry
+        self.layout = get_layout(template, theme)
+        self.colors, self.styles = self.layout.colors, self.layout.styles
+        self.width, self.height = self.layout.pagesize
+
     def create_social_links(self, linkedin_url=None, github_url=None):
         """Create social media links"""
         social_elements = []
-        
+
         if linkedin_url:
             social_elements.append(
                 Paragraph(
-                    f'<link href="{linkedin_url}"><font color="#0077B5">🔗 LinkedIn</font></link>',
+                    f'<link href="{_text(linkedin_url, quote=True)}"><font color="#0077B5">🔗 LinkedIn</font></link>',
                     self.styles['SocialLinks']
                 )
             )
-        
+
         if github_url:
             social_elements.append(
                 Paragraph(
-                    f'<link href="{github_url}"><font color="#333333">⌘ GitHub</font></link>',
+                    f'<link href="{_text(github_url, quote=True)}"><font color="#333333">⌘ GitHub</font></link>',
                     self.styles['SocialLinks']
                 )
             )
-        
+
         return social_elements
 
     def add_section_header(self, story, text):
@@ -134,191 +490,115 @@ class PDFGenerator:
         story.append(Paragraph(text, self.styles['ResumeSectionHeader']))
         story.append(HRFlowable(
             width="100%",
-            thickness=1,
-            color=self.colors['secondary'],
+            thickness=self.layout.rule.get('thickness', 1),
+            color=self.layout.rule['color'],
             spaceBefore=0,
-            spaceAfter=8,
+            spaceAfter=self.layout.rule.get('spaceAfter', 8),
             lineCap='round'
         ))
-        
+
     def create_bullet_list(self, items):
-        """Create a bullet point list"""
-        bullets = []
-        for item in items:
-            if item.strip():
-                bullet = ListItem(
-                    Paragraph(item.strip(), self.styles['ResumeBody']),
-                    leftIndent=20,
-                    bulletColor=self.colors['accent']
-                )
-                bullets.append(bullet)
+        """Create a bullet point list styled by the template"""
+        bullets = self.layout.bullets
         return ListFlowable(
-            bullets,
+            [
+                ListItem(Paragraph(_text(item.strip()), self.styles['ResumeBody']), bulletColor=bullets['bulletColor'])
+                for item in items if item.strip()
+            ],
             bulletType='bullet',
-            start='•'
+            leftIndent=bullets.get('leftIndent', 20),
+            bulletFontSize=bullets.get('bulletFontSize', 8)
         )
-        
+
+    def memoized(self, parts, build):
+        """Return build()'s flowables, reusing the ones built for identical parts earlier on this thread
+
+        A flowable can appear only once in a story, so parts repeated within
+        one render (two identical entries) are built again.
+        """
+        if not self.reuse_flowables:
+            return build()
+        layout = self.layout
+        key = make_cache_key(layout.template, layout.version, layout.theme, *parts)
+        if key in self._used_keys:
+            metrics.inc('pdf_flowable_cache_total', result='repeat')
+            return build()
+        self._used_keys.append(key)
+        flowables = _flowable_cache.get(key)
+        if flowables is not None:
+            metrics.inc('pdf_flowable_cache_total', result='hit')
+            for flowable in flowables:
+                flowable.reset_layout()
+            return flowables
+        metrics.inc('pdf_flowable_cache_total', result='miss')
+        flowables = [_memoize_wrap(flowable) for flowable in build()]
+        _flowable_cache.set(key, flowables)
+        return flowables
+
+    def cache_key(self, resume_content):
+        """Content hash identifying the PDF this generator renders for resume_content"""
+        layout = self.layout
+        return make_cache_key('pdf', layout.template, layout.version, layout.theme, THEMES[layout.theme],
+                              resume_content)
+
     def generate_pdf(self, resume_content):
-        """Generate a PDF resume from the given content"""
+        """Generate a PDF resume from the given content and return it as bytes"""
+        start = time.perf_counter()
+        if self.cache is not None:
+            cache_key = self.cache_key(resume_content)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                pdf_bytes, self.page_count = cached
+                self._write_output(pdf_bytes)
+                metrics.observe('pdf_phase_seconds', time.perf_counter() - start, phase='cached')
+                return pdf_bytes
+
+        buffer = BytesIO()
+        margins = self.layout.margins
         doc = SimpleDocTemplate(
-            self.output_file,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
+            buffer,
+            pagesize=self.layout.pagesize,
+            rightMargin=margins,
+            leftMargin=margins,
+            topMargin=margins,
+            bottomMargin=margins
         )
-        
+
+        # Each compiled section appends its flowables in template order; sections
+        # whose fields are unchanged since an earlier render reuse that render's flowables
         story = []
-        
-        # Add name as main header
-        name = resume_content.get('name', '').strip()
-        if name:
-            story.append(Paragraph(name, self.styles['ResumeHeader']))
-        
-        # Add contact info in a clean format
-        contact_info = []
-        
-        # Add email and phone in first line
-        primary_contact = []
-        if resume_content.get('email'):
-            primary_contact.append(f"Email: {resume_content['email']}")
-        if resume_content.get('phone'):
-            primary_contact.append(f"Phone: {resume_content['phone']}")
-        if primary_contact:
-            story.append(Paragraph(
-                ' | '.join(primary_contact),
-                self.styles['ContactInfo']
-            ))
-            
-        # Add location
-        if resume_content.get('location'):
-            story.append(Paragraph(
-                f"Location: {resume_content['location']}",
-                self.styles['ContactInfo']
+        self._used_keys = []
+        for index, (section_type, build_section) in enumerate(self.layout.sections):
+            fields = {field: resume_content.get(field) for field in SECTION_FIELDS[section_type]}
+            story.extend(self.memoized(
+                ('section', index, doc.width, fields),
+                partial(build_section, self, resume_content, doc.width)
             ))
-        
-        # Add social media links with icons
-        social_elements = self.create_social_links(
-            linkedin_url=resume_content.get('linkedin'),
-            github_url=resume_content.get('github')
-        )
-        
-        if social_elements:
-            # Create a table for social links to keep them centered and properly spaced
-            social_data = [[element] for element in social_elements]
-            social_table = Table(social_data, colWidths=[doc.width * 0.8])
-            social_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            story.append(social_table)
-        
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add professional summary
-        if resume_content.get('professional_summary'):
-            self.add_section_header(story, 'Professional Summary')
-            story.append(Paragraph(resume_content['professional_summary'], self.styles['ResumeBody']))
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Add experience section with enhanced formatting
-        if resume_content.get('experience'):
-            self.add_section_header(story, 'Professional Experience')
-            for exp in resume_content['experience']:
-                # Company and position as sub-header
-                story.append(Paragraph(
-                    f"{exp.get('company', '')} - {exp.get('position', '')}",
-                    self.styles['ResumeSubHeader']
-                ))
-                
-                # Duration as metadata
-                if exp.get('duration'):
-                    story.append(Paragraph(
-                        exp['duration'],
-                        self.styles['ResumeMetadata']
-                    ))
-                
-                # Achievements as bullet points
-                achievements = exp.get('achievements', '').split('\n')
-                bullets = []
-                for achievement in achievements:
-                    if achievement.strip():
-                        # Remove the asterisk if it exists at the start
-                        achievement = achievement.strip().lstrip('*').strip()
-                        bullets.append(ListItem(
-                            Paragraph(achievement, self.styles['ResumeBody']),
-                            bulletColor=self.colors['accent']
-                        ))
-                if bullets:
-                    story.append(ListFlowable(
-                        bullets,
-                        bulletType='bullet',
-                        leftIndent=20,
-                        bulletFontSize=8
-                    ))
-                story.append(Spacer(1, 0.15*inch))
-        
-        # Add education section with enhanced formatting
-        if resume_content.get('education'):
-            self.add_section_header(story, 'Education')
-            for edu in resume_content['education']:
-                # Institution and degree
-                header_parts = []
-                if edu.get('institution'):
-                    header_parts.append(edu['institution'])
-                if edu.get('degree'):
-                    header_parts.append(edu['degree'])
-                if edu.get('field_of_study'):
-                    header_parts.append(edu['field_of_study'])
-                
-                if header_parts:
-                    story.append(Paragraph(
-                        ' - '.join(header_parts),
-                        self.styles['ResumeSubHeader']
-                    ))
-                
-                # Education details
-                details = []
-                if edu.get('year'):
-                    details.append(edu['year'])
-                if edu.get('grade'):
-                    details.append(f"Grade: {edu['grade']}")
-                if edu.get('location'):
-                    details.append(edu['location'])
-                
-                if details:
-                    story.append(Paragraph(
-                        ' | '.join(details),
-                        self.styles['ResumeMetadata']
-                    ))
-                
-                # Add achievements if any
-                if edu.get('achievements'):
-                    achievements = edu['achievements'].split('\n')
-                    bullets = []
-                    for achievement in achievements:
-                        if achievement.strip():
-                            bullets.append(ListItem(
-                                Paragraph(achievement.strip(), self.styles['ResumeBody']),
-                                bulletColor=self.colors['accent']
-                            ))
-                    if bullets:
-                        story.append(ListFlowable(
-                            bullets,
-                            bulletType='bullet',
-                            leftIndent=20,
-                            bulletFontSize=8
-                        ))
-                
-                story.append(Spacer(1, 0.15*inch))
-        
-        # Add skills section
-        if resume_content.get('skills'):
-            self.add_section_header(story, 'Skills')
-            story.append(Paragraph(resume_content['skills'], self.styles['ResumeBody']))
-        
+
+        built = time.perf_counter()
+        metrics.observe('pdf_phase_seconds', built - start, phase='story')
+
         # Generate the PDF
-        doc.build(story)
+        try:
+            doc.build(story)
+        except BaseException:
+            # A failed layout can leave flowables half-split; don't reuse them
+            _flowable_cache.discard(self._used_keys)
+            raise
+        self.page_count = doc.page
+        pdf_bytes = buffer.getvalue()
+        metrics.observe('pdf_phase_seconds', time.perf_counter() - built, phase='build')
+        metrics.inc('pdf_pages_total', self.page_count)
+        metrics.inc('pdf_bytes_total', len(pdf_bytes))
+
+        if self.cache is not None:
+            self.cache.set(cache_key, pdf_bytes, self.page_count)
+        self._write_output(pdf_bytes)
+        return pdf_bytes
+
+    def _write_output(self, pdf_bytes):
+        if self.output_file:
+            start = time.perf_counter()
+            with open(self.output_file, 'wb') as f:
+                f.write(pdf_bytes)
+            metrics.observe('pdf_phase_seconds', time.perf_counter() - start, phase='write')
@@ -0,0 +1,108 @@
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import PREFETCH_WORKERS
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+# What a slot is currently prefetching: the section's cache key and the running call
+_Prefetch = namedtuple('_Prefetch', ['key', 'section', 'future'])
+
+
+class Prefetcher:
+    """Runs AIGenerator.enhance_* calls speculatively, before the user asks to generate
+
+    Each owner (a username) has one slot per section, e.g. ('experience', 2)
+    or 'summary'. Scheduling a slot with new inputs replaces what it was
+    prefetching: a call that hasn't started is cancelled, one that has is left
+    to finish and its result is discarded. Nothing is lost either way,
+    because results are only ever read back through the response cache, by
+    the hash of their inputs, so a later generation with the same inputs
+    finds them and one with different inputs ignores them. Identical inputs
+    scheduled by several owners share one call.
+    """
+
+    def __init__(self, ai_generator=None, workers=PREFETCH_WORKERS):
+        self._ai_generator = ai_generator
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        self._slots = {}
+        self._inflight = {}
+        # Reentrant: cancelling a future runs its done callback, which takes the lock, in this thread
+        self._lock = threading.RLock()
+
+    @property
+    def ai_generator(self):
+        if self._ai_generator is None:
+            from utils.ai_generator import get_ai_generator
+            self._ai_generator = get_ai_generator()
+        return self._ai_generator
+
+    def schedule(self, owner, slot, section, *args):
+        """Prefetch enhance_<section>(*args) for owner's slot; returns its future"""
+        key = self.ai_generator.section_key(section, *args)
+        with self._lock:
+            current = self._slots.get((owner, slot))
+            if current is not None and current.key == key:
+                return current.future
+            if current is not None:
+                self._release(owner, slot)
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._run, section, args)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._done(key))
+                metrics.inc('ai_prefetch_total', section=section, result='scheduled')
+            else:
+                metrics.inc('ai_prefetch_total', section=section, result='shared')
+            self._slots[(owner, slot)] = _Prefetch(key, section, future)
+            return future
+
+    def cancel(self, owner, slot=None):
+        """Drop owner's prefetch for slot, or for every slot when slot is None"""
+        with self._lock:
+            slots = [slot] if slot is not None else [s for o, s in self._slots if o == owner]
+            for slot in slots:
+                if (owner, slot) in self._slots:
+                    self._release(owner, slot)
+
+    def _release(self, owner, slot):
+        """Remove a slot, cancelling its call unless another slot still wants it (lock held)"""
+        prefetch = self._slots.pop((owner, slot))
+        if any(other.key == prefetch.key for other in self._slots.values()):
+            return
+        if prefetch.future.cancel():
+            metrics.inc('ai_prefetch_total', section=prefetch.section, result='cancelled')
+        elif not prefetch.future.done():
+            metrics.inc('ai_prefetch_total', section=prefetch.section, result='discarded')
+
+    def _done(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _run(self, section, args):
+        try:
+            getattr(self.ai_generator, f'enhance_{section}')(*args)
+            metrics.inc('ai_prefetch_total', section=section, result='done')
+        except Exception as e:
+            # Speculative work only: generation makes the call again if it needs it
+            logger.info("Prefetching %s failed: %s", section, e)
+            metrics.inc('ai_prefetch_total', section=section, result='failed')
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_prefetcher():
+    """Return the prefetcher shared by every session in this process"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher()
+    return _prefetcher
@@ -0,0 +1,144 @@
+import random
+import threading
+import time
+
+# Exception class names raised by google-api-core (and the fake LLM backend)
+# for quota, overload and transient errors
+RETRYABLE_ERRORS = {
+    'TransientBackendError',
+    'ResourceExhausted',
+    'TooManyRequests',
+    'ServiceUnavailable',
+    'DeadlineExceeded',
+    'InternalServerError'
+}
+
+
+class RateLimitError(Exception):
+    """Raised when a call could not be made or retried before its deadline"""
+
+
+def is_retryable(error):
+    """Return True for quota (429) and transient server errors"""
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    message = str(error)
+    return '429' in message or 'quota' in message.lower()
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller in the process"""
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {
+            'acquired': 0,
+            'waiting': 0,
+            'timeouts': 0,
+            'queue_wait_seconds': 0.0,
+            'max_queue_wait_seconds': 0.0
+        }
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline=None):
+        """Block until a token is available and return the seconds spent waiting
+
+        deadline is an absolute time.monotonic() value; RateLimitError is raised
+        if no token can be obtained before it.
+        """
+        start = time.monotonic()
+        with self._lock:
+            self.stats['waiting'] += 1
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        waited = now - start
+                        self.stats['acquired'] += 1
+                        self.stats['queue_wait_seconds'] += waited
+                        self.stats['max_queue_wait_seconds'] = max(
+                            self.stats['max_queue_wait_seconds'], waited
+                        )
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+
+                if deadline is not None and now + delay > deadline:
+                    with self._lock:
+                        self.stats['timeouts'] += 1
+                    raise RateLimitError("Timed out waiting for the model rate limiter")
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self.stats['waiting'] -= 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+class RetryPolicy:
+    """Runs calls through a rate limiter with jittered exponential backoff and a deadline"""
+
+    def __init__(self, limiter=None, max_attempts=5, base_delay=1.0, max_delay=20.0, deadline=60.0):
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'retries': 0,
+            'failures': 0,
+            'gave_up': 0
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given (1-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, func, *args, **kwargs):
+        """Call func, retrying retryable errors until max_attempts or the deadline"""
+        self._count('calls')
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.limiter is not None:
+                self.limiter.acquire(deadline)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    self._count('failures')
+                    raise
+                delay = self.backoff(attempt)
+                if attempt >= self.max_attempts or time.monotonic() + delay > deadline:
+                    self._count('gave_up')
+                    raise RateLimitError(
+                        f"Model is over capacity, gave up after {attempt} attempts: {e}"
+                    ) from e
+                self._count('retries')
+                time.sleep(delay)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        if self.limiter is not None:
+            stats.update(self.limiter.get_stats())
+        return stats
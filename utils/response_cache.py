@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.sqlite_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts):
+    """Build a content-addressed key from JSON-serialisable parts"""
+    normalized = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache for AI responses: an in-process LRU and an optional SQLite store"""
+
+    # Entry i upgrades the cache schema from version i to i + 1
+    MIGRATIONS = [
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS ai_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            '''
+        ]
+    ]
+
+    def __init__(self, max_entries=512, ttl_seconds=7 * 24 * 3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+        self.pool = get_pool(db_path) if db_path else None
+        if self.pool:
+            self._init_db()
+
+    def _init_db(self):
+        """Create the persistent cache table if it doesn't exist"""
+        self.pool.migrate('ai_response_cache', self.MIGRATIONS)
+
+    def get(self, key, count_miss=True):
+        """Return the cached value for key, or None on a miss
+
+        count_miss=False leaves a miss out of the stats, for a second look at
+        a key whose miss was already counted.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return value
+                del self._entries[key]
+                self.stats['expired'] += 1
+
+        if self.pool:
+            value, expires_at = self._disk_get(key, now)
+            if value is not None:
+                with self._lock:
+                    self._remember(key, value, expires_at)
+                    self.stats['disk_hits'] += 1
+                return value
+
+        if count_miss:
+            with self._lock:
+                self.stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        """Store value under key in every enabled tier"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self.pool:
+            self._disk_set(key, value, expires_at)
+
+    def _remember(self, key, value, expires_at):
+        """Insert into the LRU tier, evicting the least recently used entries (lock held)"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _disk_get(self, key, now):
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    'SELECT value, expires_at FROM ai_response_cache WHERE cache_key = ?',
+                    (key,)
+                ).fetchone()
+                if row and row[1] <= now:
+                    conn.execute('DELETE FROM ai_response_cache WHERE cache_key = ?', (key,))
+                    with self._lock:
+                        self.stats['expired'] += 1
+                    row = None
+            return row if row else (None, None)
+        except sqlite3.Error as e:
+            logger.error("Error reading response cache: %s", e)
+            return None, None
+
+    def _disk_set(self, key, value, expires_at):
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO ai_response_cache (cache_key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, value, expires_at)
+                )
+        except sqlite3.Error as e:
+            logger.error("Error writing response cache: %s", e)
+
+    def purge_expired(self):
+        """Drop expired entries from both tiers"""
+        now = time.time()
+        with self._lock:
+            stale = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for key in stale:
+                del self._entries[key]
+            self.stats['expired'] += len(stale)
+        if self.pool:
+            try:
+                with self.pool.connection() as conn:
+                    cursor = conn.execute('DELETE FROM ai_response_cache WHERE expires_at <= ?', (now,))
+                with self._lock:
+                    self.stats['expired'] += cursor.rowcount
+            except sqlite3.Error as e:
+                logger.error("Error purging response cache: %s", e)
+
+    def clear(self):
+        """Empty the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Return a snapshot of the hit/miss counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
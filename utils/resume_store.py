@@ -0,0 +1,75 @@
+import json
+from utils.sqlite_pool import get_pool
+
+
+class ResumeStore:
+    """Per-user resume drafts and generated sections, stored alongside the users table"""
+
+    # Entry i upgrades the resume schema from version i to i + 1
+    MIGRATIONS = [
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS resume_drafts (
+                username TEXT PRIMARY KEY,
+                draft TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS resume_sections (
+                username TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                section TEXT NOT NULL,
+                content TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (username, input_hash)
+            )
+            '''
+        ]
+    ]
+
+    def __init__(self, db_path='users.db'):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self._init_db()
+
+    def _init_db(self):
+        """Bring the schema up to date (runs once per database per process)"""
+        self.pool.migrate('resumes', self.MIGRATIONS)
+
+    def save_draft(self, username, draft):
+        """Save the user's form draft, replacing any previous one"""
+        with self.pool.connection() as conn:
+            conn.execute(
+                '''
+                INSERT INTO resume_drafts (username, draft, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(username) DO UPDATE SET draft = excluded.draft, updated_at = excluded.updated_at
+                ''',
+                (username, json.dumps(draft))
+            )
+
+    def load_draft(self, username):
+        """Return the user's saved form draft, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT draft FROM resume_drafts WHERE username = ?', (username,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_sections(self, username):
+        """Return {input_hash: content} for the user's last generated sections"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                'SELECT input_hash, content FROM resume_sections WHERE username = ?', (username,)
+            ).fetchall()
+        return dict(rows)
+
+    def save_sections(self, username, sections):
+        """Replace the user's generated sections with {input_hash: (section, content)}"""
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM resume_sections WHERE username = ?', (username,))
+            conn.executemany(
+                'INSERT INTO resume_sections (username, input_hash, section, content) VALUES (?, ?, ?, ?)',
+                [(username, input_hash, section, content)
+                 for input_hash, (section, content) in sections.items()]
+            )
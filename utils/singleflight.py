@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import Future
+
+
+class Abandoned(Exception):
+    """The leading call stopped without a result, e.g. its stream was closed early"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution
+
+    The first caller for a key leads: it makes the call and publishes the
+    outcome. Callers arriving while that call is in flight wait for it and
+    receive the same result, or have the same exception raised. Nothing is
+    remembered once the call completes, so later callers make a new call;
+    serving repeats is the response cache's job. If the leader stops without
+    an outcome (an abandoned stream), its waiters start over and one of them
+    leads the retry.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'abandoned': 0
+        }
+
+    def begin(self, key):
+        """Return (future, leader); a leader must make the call and then finish() it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.stats['calls'] += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """Publish the leader's result, or the exception it raised, to every waiter"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            if isinstance(error, Exception):
+                self.stats['errors'] += 1
+            elif error is not None:
+                self.stats['abandoned'] += 1
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # GeneratorExit, KeyboardInterrupt...: not the waiters' failure
+            future.set_exception(Abandoned(f"Leading call stopped by {type(error).__name__}"))
+
+    def do(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), sharing one execution with concurrent callers for key"""
+        while True:
+            future, leader = self.begin(key)
+            if not leader:
+                try:
+                    return future.result()
+                except Abandoned:
+                    continue
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                self.finish(key, future, error=e)
+                raise
+            self.finish(key, future, result=result)
+            return result
+
+    def get_stats(self):
+        """Return a snapshot of the counters and the number of calls in flight"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
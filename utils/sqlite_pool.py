@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Bounded pool of shared SQLite connections with WAL journaling and tuned pragmas
+
+    A connection is checked out for a block of work and returned afterwards,
+    so any thread (Streamlit runs every rerun on a new one) reuses an open
+    connection and its sqlite3 statement cache instead of connecting and
+    reparsing SQL again. At most max_connections are open; other callers wait
+    up to the busy timeout for one to be returned. A thread that already holds
+    a connection gets the same one back from nested calls.
+    """
+
+    def __init__(self, db_path, max_connections=8, busy_timeout_ms=5000, synchronous='NORMAL',
+                 cached_statements=256):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        # Used as a stack, so the most recently returned connection (warmest statement cache) goes out first
+        self._idle = []
+        self._held = threading.local()
+        self._opened = 0
+        self._generation = 0
+        self._wal = False
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._migrate_lock = threading.Lock()
+        self._migrated = set()
+
+    def _connect(self):
+        # Autocommit mode: single statements commit on their own and
+        # multi-statement work goes through transaction()
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        try:
+            with self._lock:
+                # WAL is a property of the database file: set it once per pool
+                if not self._wal:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    self._wal = True
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _checkout(self):
+        """Take an idle connection, open a new one below the limit, or wait for one to be returned"""
+        deadline = time.monotonic() + self.busy_timeout_ms / 1000
+        with self._returned:
+            while not self._idle and self._opened >= self.max_connections:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._returned.wait(remaining):
+                    raise sqlite3.OperationalError(
+                        f"Timed out waiting for one of {self.max_connections} connections to {self.db_path}"
+                    )
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+            generation = self._generation
+        try:
+            return generation, self._connect()
+        except BaseException:
+            with self._returned:
+                if generation == self._generation:
+                    self._opened -= 1
+                    self._returned.notify()
+            raise
+
+    def _checkin(self, generation, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._returned:
+            if generation == self._generation:
+                self._idle.append((generation, conn))
+                self._returned.notify()
+                return
+        # Opened before close_all(): retire it
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block"""
+        held = getattr(self._held, 'conn', None)
+        if held is not None:
+            yield held
+            return
+        generation, conn = self._checkout()
+        self._held.conn = conn
+        try:
+            yield conn
+        finally:
+            self._held.conn = None
+            self._checkin(generation, conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements atomically, taking the write lock up front"""
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def migrate(self, component, migrations):
+        """Apply any of a component's migrations newer than its recorded schema version
+
+        migrations is an ordered list where entry i holds the SQL statements
+        that take the component's schema from version i to i + 1. The check
+        runs once per component per process.
+        """
+        if component in self._migrated:
+            return
+        with self._migrate_lock:
+            if component in self._migrated:
+                return
+            with self.transaction() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS schema_versions (
+                        component TEXT PRIMARY KEY,
+                        version INTEGER NOT NULL
+                    )
+                ''')
+                row = conn.execute(
+                    'SELECT version FROM schema_versions WHERE component = ?', (component,)
+                ).fetchone()
+                version = row[0] if row else 0
+                for statements in migrations[version:]:
+                    for statement in statements:
+                        conn.execute(statement)
+                if len(migrations) > version:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO schema_versions (component, version) VALUES (?, ?)',
+                        (component, len(migrations))
+                    )
+            self._migrated.add(component)
+
+    def close_all(self):
+        """Close the idle connections; ones checked out now are closed when returned"""
+        with self._returned:
+            self._generation += 1
+            self._opened = 0
+            idle, self._idle = self._idle, []
+            self._returned.notify_all()
+        for _, conn in idle:
+            conn.close()
+
+
+def get_pool(db_path):
+    """Return the process-wide pool for a database file"""
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[key] = pool
+    return pool
@@ -0,0 +1,77 @@
+import logging
+import threading
+from config.settings import PDF_TEMPLATE
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+# Touches every section builder, so a render loads the fonts and flowables a real resume uses
+SAMPLE_RESUME = {
+    'name': 'Warm Up',
+    'email': 'warmup@example.com',
+    'phone': '9876543210',
+    'location': 'Pune',
+    'linkedin': 'https://linkedin.com/in/warmup',
+    'github': 'https://github.com/warmup',
+    'professional_summary': 'Engineer.',
+    'experience': [{'company': 'Example', 'position': 'Engineer', 'duration': '2020 - 2022',
+                    'achievements': '* Built things'}],
+    'education': [{'institution': 'University', 'degree': 'BTech', 'year': '2020', 'grade': '9.0',
+                   'achievements': 'Graduated'}],
+    'skills': 'TECHNICAL: Python'
+}
+
+
+def _warm_ai():
+    """Import the model SDK and create the shared client"""
+    from utils.ai_generator import get_ai_generator
+    get_ai_generator().backend
+
+
+def _warm_pdf():
+    """Import ReportLab, compile the template for every theme and render once"""
+    from utils.pdf_generator import THEMES, PDFGenerator, get_layout
+    for theme in THEMES:
+        get_layout(PDF_TEMPLATE, theme)
+    PDFGenerator(reuse_flowables=False, use_cache=False).generate_pdf(SAMPLE_RESUME)
+
+
+def _warm_pdf_viewer():
+    try:
+        import streamlit_pdf_viewer  # noqa: F401
+    except ImportError:
+        pass
+
+
+STEPS = [
+    ('pdf', _warm_pdf),
+    ('ai', _warm_ai),
+    ('pdf_viewer', _warm_pdf_viewer)
+]
+
+
+def warm_up():
+    """Preload the dependencies the first resume generation needs
+
+    Each step is independent: a failure (e.g. a missing API key) is logged
+    and the remaining steps still run.
+    """
+    for name, step in STEPS:
+        try:
+            with metrics.timer('warmup_seconds', step=name):
+                step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+
+
+def start_warmup():
+    """Run warm_up() on a background thread (once per process)"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name='warmup', daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread